@@ -5,7 +5,8 @@ import os
 from flask import Flask
 from .config import Config, config_manager
 
-from .extensions import db, migrate, login_manager, limiter
+from .extensions import (db, migrate, login_manager, jwt, limiter, price_cache, indicator_cache, fetch_jobs,
+                         principal_cache, request_metrics, query_metrics, readiness)
 from .utils.constants import HttpStatusCode
 from .utils.common import send_json_response
 
@@ -73,9 +74,18 @@ def initialise_flask_login(app):
 
 
 def register_extensions(app):
+    # First, so that requests rejected by the rate limiter are timed too
+    request_metrics.init_app(app)
     db.init_app(app)
+    query_metrics.init_app(app, db)
     migrate.init_app(app, db)
+    jwt.init_app(app)
     limiter.init_app(app)
+    price_cache.init_app(app)
+    indicator_cache.init_app(app)
+    fetch_jobs.init_app(app)
+    principal_cache.init_app(app)
+    readiness.init_app(app, db)
 
 
 def register_blueprints(app):
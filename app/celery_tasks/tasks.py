@@ -1,20 +1,170 @@
 from app import celery_app, create_app
-from app.services.stock_fetcher import fetch_and_store_stock_data
-from datetime import datetime
+from app.extensions import fetch_jobs
+from app.models import Stock
+from app.services.indicator_service import calculate_batch_indicators, calculate_indicators
+from app.services.stock_fetcher import fetch_and_store_stock_data, print_fetch_summary, refresh_derived_data
+from celery import chord, group
+from datetime import date, datetime
 import os
+import time
 
 flask_app = create_app(os.getenv("FLASK_CONFIG") or "dev")
 
+
+def _shards(symbols: list, size: int) -> list:
+    size = max(1, size)
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
 @celery_app.task(name='tasks.fetch_and_store_task')
 def fetch_and_store_task():
+    """
+    Coordinate the nightly refresh: split the stored symbols into shards of
+    ``FETCH_SHARD_SIZE`` and run them as a chord of ``fetch_shard_task`` across
+    all workers, with ``finish_refresh_task`` as the callback.
+    """
     try:
 
         print(f"All symbol data fetching started at: {datetime.now()}")
 
         with flask_app.app_context():
-            fetch_and_store_stock_data()
+            symbols = [s.symbol for s in Stock.query.order_by(Stock.symbol).all()]
+            shards = _shards(symbols, flask_app.config["FETCH_SHARD_SIZE"])
+
+        if not shards:
+            print("No symbols to fetch")
+            return
 
-        print(f"All symbol data fetching finished at: {datetime.now()}")
+        header = group(fetch_shard_task.s(shard) for shard in shards)
+        chord(header)(finish_refresh_task.s(started=time.time()))
+
+        print(f"Dispatched {len(symbols)} symbols in {len(shards)} shards at: {datetime.now()}")
 
     except Exception as e:
         print(f"Error in fetching and storing data for all symbols: {e}")
+
+
+@celery_app.task(bind=True, name='tasks.fetch_shard_task')
+def fetch_shard_task(self, symbols: list, timings: dict = None):
+    """
+    Fetch and store one shard of symbols, deferring indicator work to the
+    chord callback. Symbols that failed to download are retried on their own
+    with exponential backoff; once retries run out the shard still returns,
+    reporting them as failed, so one bad ticker cannot hold back the callback.
+
+    Returns:
+        dict: {symbol: timing} as in ``fetch_and_store_stock_data``
+    """
+    timings = timings or {}
+    max_retries = flask_app.config["FETCH_SHARD_MAX_RETRIES"]
+    countdown = flask_app.config["FETCH_SHARD_RETRY_DELAY"] * 2 ** self.request.retries
+
+    try:
+        with flask_app.app_context():
+            summary = fetch_and_store_stock_data(symbols=symbols, refresh_derived=False)
+    except Exception as e:
+        print(f"Error in fetching shard {symbols[0]}..{symbols[-1]}: {e}")
+        if self.request.retries < max_retries:
+            raise self.retry(args=[symbols], kwargs={"timings": timings}, countdown=countdown,
+                             max_retries=max_retries)
+        for sym in symbols:
+            timings[sym] = {"download": 0.0, "store": 0.0, "inserted": 0, "updated": 0, "status": "failed"}
+        return timings
+
+    for sym, timing in summary["timings"].items():
+        # Keep the bars stored by earlier attempts in the counts
+        previous = timings.get(sym, {})
+        timing["inserted"] += previous.get("inserted", 0)
+        timing["updated"] += previous.get("updated", 0)
+        timings[sym] = timing
+
+    failed = [sym for sym in symbols if timings[sym]["status"] == "failed"]
+    if failed and self.request.retries < max_retries:
+        print(f"Retrying {len(failed)} failed symbols in {countdown}s: {', '.join(failed)}")
+        raise self.retry(args=[failed], kwargs={"timings": timings}, countdown=countdown,
+                         max_retries=max_retries)
+    return timings
+
+
+@celery_app.task(name='tasks.finish_refresh_task')
+def finish_refresh_task(shard_timings: list, started: float):
+    """
+    Chord callback: report the whole refresh, then invalidate cached indicator
+    results and materialize indicators for every symbol that got new bars,
+    again sharded across the workers.
+    """
+    timings = {}
+    for shard in shard_timings:
+        timings.update(shard)
+
+    print_fetch_summary({
+        "symbols": len(timings),
+        "elapsed": time.time() - started,
+        "concurrency": f"{len(shard_timings)} shards x {flask_app.config['FETCH_CONCURRENCY']}",
+        "timings": timings,
+    })
+    print(f"All symbol data fetching finished at: {datetime.now()}")
+
+    if any(timing["status"] != "failed" for timing in timings.values()):
+        try:
+            fetch_jobs.mark_refreshed()
+        except Exception as e:
+            print(f"Error in recording the refresh time: {e}")
+
+    changed = sorted(sym for sym, timing in timings.items() if timing["inserted"] or timing["updated"])
+    if changed:
+        group(
+            refresh_derived_task.s(shard) for shard in _shards(changed, flask_app.config["FETCH_SHARD_SIZE"])
+        ).apply_async()
+
+
+@celery_app.task(name='tasks.refresh_derived_task')
+def refresh_derived_task(symbols: list):
+    with flask_app.app_context():
+        for sym in symbols:
+            refresh_derived_data(sym)
+
+
+@celery_app.task(name='tasks.fetch_symbol_task')
+def fetch_symbol_task(symbol: str, job_id: str):
+    """Run a ``/stock/fetch`` job, recording its progress and row counts in ``fetch_jobs``."""
+    with flask_app.app_context():
+        fetch_jobs.mark_running(job_id)
+        try:
+            summary = fetch_and_store_stock_data(symbol)
+        except Exception as e:
+            print(f"Error in fetching and storing data for {symbol}: {e}")
+            fetch_jobs.fail(job_id, symbol, str(e))
+            return
+
+        timing = summary["timings"][symbol]
+        if timing["status"] == "failed":
+            fetch_jobs.fail(job_id, symbol, timing["error"])
+        else:
+            fetch_jobs.finish(job_id, symbol, timing["inserted"], timing["updated"], timing["status"])
+
+
+@celery_app.task(name='tasks.indicators_job_task')
+def indicators_job_task(symbol: str, indicators: dict, backend: str = None, start: str = None, end: str = None,
+                        limit: int = None, date_format: str = None):
+    """
+    ``calculate_indicators`` for a request too heavy to serve inline. The
+    result is read back by ``/stock/indicators/jobs/<job_id>``.
+
+    Returns:
+        dict: {'data': indicator payload, 'date_format': columnar date format or None}
+    """
+    with flask_app.app_context():
+        result = calculate_indicators(symbol, indicators, backend=backend,
+                                      start=date.fromisoformat(start) if start else None,
+                                      end=date.fromisoformat(end) if end else None,
+                                      limit=limit, date_format=date_format)
+    return {"data": result, "date_format": date_format}
+
+
+@celery_app.task(name='tasks.batch_indicators_job_task')
+def batch_indicators_job_task(symbols: list, indicators: dict, backend: str = None):
+    """``calculate_batch_indicators`` as a background job, see ``indicators_job_task``."""
+    with flask_app.app_context():
+        result = calculate_batch_indicators(symbols, indicators, backend=backend)
+    return {"data": result, "date_format": None}
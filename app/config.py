@@ -10,6 +10,9 @@ class Config(object):
     CELERY_ACCEPT_CONTENT = ["json"]
     CELERY_TASK_SERIALIZER = "json"
     CELERY_RESULT_SERIALIZER = "json"
+    CELERY_TRACK_STARTED = True
+    # How long task results are kept, and so how long indicator job ids can be polled
+    CELERY_TASK_RESULT_EXPIRES = int(os.environ.get("CELERY_TASK_RESULT_EXPIRES", 24 * 60 * 60))
 
     # Flask-Limiter configuration
     RATELIMIT_STORAGE_URL = os.environ.get("RATELIMIT_STORAGE_URL", "memory://")
@@ -19,9 +22,145 @@ class Config(object):
     RATELIMIT_STORAGE_OPTIONS = {}
     RATELIMIT_IN_MEMORY_FALLBACK_ENABLED = os.environ.get("RATELIMIT_IN_MEMORY_FALLBACK_ENABLED", "True").lower() == "true"
 
+    # Per-worker price frame cache
+    PRICE_CACHE_ENABLED = os.environ.get("PRICE_CACHE_ENABLED", "True").lower() == "true"
+    PRICE_CACHE_MAX_ENTRIES = int(os.environ.get("PRICE_CACHE_MAX_ENTRIES", 128))
+    PRICE_CACHE_MAX_BYTES = int(os.environ.get("PRICE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+    # Shared indicator result cache, on the same Redis as Celery unless configured otherwise
+    INDICATOR_CACHE_ENABLED = os.environ.get("INDICATOR_CACHE_ENABLED", "True").lower() == "true"
+    INDICATOR_CACHE_URL = os.environ.get("INDICATOR_CACHE_URL", CELERY_BROKER_URL)
+    INDICATOR_CACHE_TTL = int(os.environ.get("INDICATOR_CACHE_TTL", 6 * 60 * 60))
+    INDICATOR_CACHE_LOCK_TIMEOUT = int(os.environ.get("INDICATOR_CACHE_LOCK_TIMEOUT", 30))
+    INDICATOR_CACHE_WAIT_TIMEOUT = float(os.environ.get("INDICATOR_CACHE_WAIT_TIMEOUT", 10))
+    INDICATOR_CACHE_SOCKET_TIMEOUT = float(os.environ.get("INDICATOR_CACHE_SOCKET_TIMEOUT", 0.5))
+
+    # Authenticated users are cached per worker for PRINCIPAL_CACHE_TTL seconds (the
+    # longest another worker may serve a user after a change or logout), and also in
+    # Redis when PRINCIPAL_CACHE_URL is set, instead of loaded on every request
+    PRINCIPAL_CACHE_ENABLED = os.environ.get("PRINCIPAL_CACHE_ENABLED", "True").lower() == "true"
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 60))
+    PRINCIPAL_CACHE_URL = os.environ.get("PRINCIPAL_CACHE_URL")
+    PRINCIPAL_CACHE_SOCKET_TIMEOUT = float(os.environ.get("PRINCIPAL_CACHE_SOCKET_TIMEOUT", 0.2))
+
+    # Report per-request phase durations (auth, load, compute, serialize) to clients in a
+    # Server-Timing header; they are recorded for /metrics either way
+    SERVER_TIMING_ENABLED = os.environ.get("SERVER_TIMING_ENABLED", "True").lower() == "true"
+
+    # Opt-in SQL instrumentation: statements counted per request and Celery task, those
+    # slower than SQL_SLOW_QUERY_MS logged and, on Postgres, a sample of the slow SELECTs
+    # logged with their EXPLAIN (ANALYZE, BUFFERS) plan, which runs the query again
+    SQL_INSTRUMENTATION_ENABLED = os.environ.get("SQL_INSTRUMENTATION_ENABLED", "False").lower() == "true"
+    SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", 250))
+    SQL_EXPLAIN_SAMPLE_RATE = float(os.environ.get("SQL_EXPLAIN_SAMPLE_RATE", 0.1))
+    SQL_EXPLAIN_MIN_INTERVAL = float(os.environ.get("SQL_EXPLAIN_MIN_INTERVAL", 60))
+
+    # Indicator compute backend: "pandas" or "numpy" (pure-NumPy kernels)
+    INDICATOR_BACKEND = os.environ.get("INDICATOR_BACKEND", "pandas")
+
+    # Weight an EMA may still give its starting value when a date range is served
+    # from a shortened history (sets how many warmup bars are loaded before the range)
+    INDICATOR_WARMUP_TOLERANCE = float(os.environ.get("INDICATOR_WARMUP_TOLERANCE", 1e-10))
+
+    # Indicator parameter sets kept up to date incrementally after each fetch
+    DEFAULT_INDICATOR_PARAMS = {
+        "rsi": [14],
+        "macd": [(12, 26, 9)],
+        "sma": [20, 50, 200],
+        "ema": [12, 26],
+    }
+
+    # Indicator requests estimated above this cost (bars x indicator series) run as a
+    # background Celery job whose result is fetched later; 0 keeps every request synchronous
+    INDICATOR_ASYNC_COST_THRESHOLD = int(os.environ.get("INDICATOR_ASYNC_COST_THRESHOLD", 25_000_000))
+
+    # Upper bound on symbols per /stock/indicators/batch request
+    BATCH_INDICATORS_MAX_SYMBOLS = int(os.environ.get("BATCH_INDICATORS_MAX_SYMBOLS", 200))
+
+    # Where fetches download bars from: "yfinance", or "replay" to serve fixtures
+    # from MARKET_DATA_REPLAY_DIR (synthetic bars for symbols without one) offline,
+    # with injected latency (seconds, plus random jitter) and failure rate
+    MARKET_DATA_PROVIDER = os.environ.get("MARKET_DATA_PROVIDER", "yfinance")
+    MARKET_DATA_REPLAY_DIR = os.environ.get("MARKET_DATA_REPLAY_DIR")
+    MARKET_DATA_LATENCY = float(os.environ.get("MARKET_DATA_LATENCY", 0))
+    MARKET_DATA_LATENCY_JITTER = float(os.environ.get("MARKET_DATA_LATENCY_JITTER", 0))
+    MARKET_DATA_ERROR_RATE = float(os.environ.get("MARKET_DATA_ERROR_RATE", 0))
+    MARKET_DATA_SEED = int(os.environ.get("MARKET_DATA_SEED", 0))
+
+    # Parallel market data downloads per fetch run; writes stay on one connection
+    FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", 8))
+
+    # Nightly refresh fan-out: symbols per Celery shard task, and how often a
+    # shard retries its failed symbols (with exponential backoff from the delay)
+    FETCH_SHARD_SIZE = int(os.environ.get("FETCH_SHARD_SIZE", 25))
+    FETCH_SHARD_MAX_RETRIES = int(os.environ.get("FETCH_SHARD_MAX_RETRIES", 3))
+    FETCH_SHARD_RETRY_DELAY = int(os.environ.get("FETCH_SHARD_RETRY_DELAY", 60))
+
+    # Asynchronous /stock/fetch jobs: where their records live, how long they are
+    # kept, and how long a queued or running job holds its symbol for deduplication
+    FETCH_JOB_URL = os.environ.get("FETCH_JOB_URL", CELERY_BROKER_URL)
+    FETCH_JOB_TTL = int(os.environ.get("FETCH_JOB_TTL", 24 * 60 * 60))
+    FETCH_JOB_CLAIM_TIMEOUT = int(os.environ.get("FETCH_JOB_CLAIM_TIMEOUT", 60 * 60))
+
+    # What a fetch does with bars already stored for the same date: "nothing" keeps
+    # them, "update" overwrites them with the provider's latest values
+    PRICE_UPSERT_ON_CONFLICT = os.environ.get("PRICE_UPSERT_ON_CONFLICT", "nothing")
+
+    # Rows fetched per server-side cursor batch when streaming history as NDJSON
+    HISTORY_STREAM_BATCH_SIZE = int(os.environ.get("HISTORY_STREAM_BATCH_SIZE", 5000))
+
+    # Which process this is: "web" (gunicorn) or "celery" (celery_worker.py sets it),
+    # selecting the database pool settings below
+    APP_ROLE = os.environ.get("APP_ROLE", "web")
+
+    # Postgres connection pool per role. Every gunicorn worker and every Celery
+    # worker process has its own pool, so the server sees up to
+    # processes x (pool_size + max_overflow) connections. pool_timeout is how long
+    # a checkout waits before failing, statement_timeout_ms caps each query (0 = none)
+    DATABASE_POOL_PRE_PING = os.environ.get("DATABASE_POOL_PRE_PING", "True").lower() == "true"
+    DATABASE_POOL_OPTIONS = {
+        "web": {
+            "pool_size": int(os.environ.get("WEB_DB_POOL_SIZE", 2)),
+            "max_overflow": int(os.environ.get("WEB_DB_MAX_OVERFLOW", 2)),
+            "pool_timeout": float(os.environ.get("WEB_DB_POOL_TIMEOUT", 5)),
+            "pool_recycle": int(os.environ.get("WEB_DB_POOL_RECYCLE", 1800)),
+            "statement_timeout_ms": int(os.environ.get("WEB_DB_STATEMENT_TIMEOUT_MS", 15000)),
+        },
+        "celery": {
+            "pool_size": int(os.environ.get("CELERY_DB_POOL_SIZE", 2)),
+            "max_overflow": int(os.environ.get("CELERY_DB_MAX_OVERFLOW", 2)),
+            "pool_timeout": float(os.environ.get("CELERY_DB_POOL_TIMEOUT", 30)),
+            "pool_recycle": int(os.environ.get("CELERY_DB_POOL_RECYCLE", 1800)),
+            "statement_timeout_ms": int(os.environ.get("CELERY_DB_STATEMENT_TIMEOUT_MS", 300000)),
+        },
+    }
+
+    # Readiness (/ready; /health-check is the liveness probe). Checks run concurrently and
+    # fail if they take longer than READINESS_TIMEOUT seconds; results are reused for
+    # READINESS_CACHE_TTL seconds. The worker is not ready (503) when one of
+    # READINESS_CRITICAL_CHECKS (database, pool, redis, celery_queue, refresh) fails. Redis and
+    # the Celery queue are shared by the whole fleet and not needed by the synchronous API (the
+    # Redis caches back off on errors), so they are reported only by default: making them
+    # critical takes every web worker out of rotation at once during a Redis outage or backlog
+    READINESS_TIMEOUT = float(os.environ.get("READINESS_TIMEOUT", 1.0))
+    READINESS_CACHE_TTL = float(os.environ.get("READINESS_CACHE_TTL", 5))
+    READINESS_CRITICAL_CHECKS = os.environ.get("READINESS_CRITICAL_CHECKS", "database,pool").split(",")
+    READINESS_DB_MAX_LATENCY_MS = float(os.environ.get("READINESS_DB_MAX_LATENCY_MS", 250))
+    READINESS_POOL_MAX_UTILIZATION = float(os.environ.get("READINESS_POOL_MAX_UTILIZATION", 1.0))
+    READINESS_CELERY_QUEUES = os.environ.get("READINESS_CELERY_QUEUES", "celery").split(",")
+    READINESS_MAX_QUEUE_DEPTH = int(os.environ.get("READINESS_MAX_QUEUE_DEPTH", 1000))
+    READINESS_MAX_REFRESH_AGE = int(os.environ.get("READINESS_MAX_REFRESH_AGE", 48 * 60 * 60))
+
     @staticmethod
     def init_app(app):
-        pass
+        from app.utils.db_pool import engine_options
+
+        options = engine_options(
+            app.config.get("SQLALCHEMY_DATABASE_URI"),
+            app.config["DATABASE_POOL_OPTIONS"][app.config["APP_ROLE"]],
+            pre_ping=app.config["DATABASE_POOL_PRE_PING"],
+        )
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {**options, **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})}
 
 
 class DevelopmentConfig(Config):
@@ -30,6 +169,7 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    INDICATOR_CACHE_ENABLED = os.environ.get("INDICATOR_CACHE_ENABLED", "False").lower() == "true"
     SQLALCHEMY_DATABASE_URI = os.environ.get("TEST_DATABASE_URI")
 
 
@@ -1,14 +1,23 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
+from flask_jwt_extended import JWTManager
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from .config import Config
+from .utils.price_cache import PriceFrameCache
+from .utils.result_cache import IndicatorResultCache
+from .utils.job_store import FetchJobStore
+from .utils.principal_cache import PrincipalCache
+from .utils.request_metrics import RequestMetrics
+from .utils.query_metrics import QueryMetrics
+from .utils.readiness import ReadinessProbe
 
 
 db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
+jwt = JWTManager()
 limiter = Limiter(
     key_func=get_remote_address,
     storage_uri=Config.RATELIMIT_STORAGE_URL,
@@ -17,3 +26,10 @@ limiter = Limiter(
     headers_enabled=Config.RATELIMIT_HEADERS_ENABLED,
     in_memory_fallback_enabled=Config.RATELIMIT_IN_MEMORY_FALLBACK_ENABLED
 )
+price_cache = PriceFrameCache()
+indicator_cache = IndicatorResultCache()
+fetch_jobs = FetchJobStore()
+principal_cache = PrincipalCache()
+request_metrics = RequestMetrics()
+query_metrics = QueryMetrics()
+readiness = ReadinessProbe()
@@ -1,4 +1,7 @@
 import pandas as pd
+from app.indicators import kernels
 
-def compute_ema(close_prices: pd.Series, window: int) -> pd.Series:
+def compute_ema(close_prices: pd.Series, window: int, backend: str = None) -> pd.Series:
+    if kernels.resolve_backend(backend) == "numpy":
+        return kernels.wrap(close_prices, kernels.ema(close_prices.to_numpy(dtype="float64"), window))
     return close_prices.ewm(span=window, adjust=False).mean()
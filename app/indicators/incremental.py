@@ -0,0 +1,168 @@
+from collections import deque
+
+NAN = float("nan")
+
+
+def params_key(params) -> str:
+    """String form of an indicator's parameters, e.g. 14 -> "14" and (12, 26, 9) -> "12,26,9"."""
+    if isinstance(params, (list, tuple)):
+        return ",".join(str(p) for p in params)
+    return str(params)
+
+
+class IncrementalEMA:
+    """EMA with ``adjust=False``, matching ``compute_ema``."""
+
+    name = "ema"
+
+    def __init__(self, span: int, value: float = None):
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.value = value
+
+    def update(self, close: float) -> float:
+        if self.value is None:
+            self.value = close
+        else:
+            self.value = self.alpha * close + (1 - self.alpha) * self.value
+        return self.value
+
+    def to_state(self) -> dict:
+        return {"value": self.value}
+
+    @classmethod
+    def from_state(cls, span: int, state: dict):
+        return cls(span, value=state.get("value"))
+
+
+class IncrementalSMA:
+    """Simple moving average over a rolling sum, matching ``compute_sma``."""
+
+    name = "sma"
+
+    def __init__(self, window: int, values=(), total: float = 0.0):
+        self.window = window
+        self.values = deque(values, maxlen=window)
+        self.total = total
+
+    def update(self, close: float) -> float:
+        if len(self.values) == self.window:
+            self.total -= self.values[0]
+        self.values.append(close)
+        self.total += close
+        if len(self.values) < self.window:
+            return NAN
+        return self.total / self.window
+
+    def to_state(self) -> dict:
+        return {"values": list(self.values), "total": self.total}
+
+    @classmethod
+    def from_state(cls, window: int, state: dict):
+        return cls(window, values=state.get("values", ()), total=state.get("total", 0.0))
+
+
+class IncrementalRSI:
+    """
+    RSI over rolling sums of gains and losses, matching ``compute_rsi``
+    (simple moving averages of the last ``window`` price changes).
+    """
+
+    name = "rsi"
+
+    def __init__(self, window: int = 14, prev_close: float = None, gains=(), losses=(),
+                 gain_total: float = 0.0, loss_total: float = 0.0):
+        self.window = window
+        self.prev_close = prev_close
+        self.gains = deque(gains, maxlen=window)
+        self.losses = deque(losses, maxlen=window)
+        self.gain_total = gain_total
+        self.loss_total = loss_total
+
+    def update(self, close: float) -> float:
+        prev_close, self.prev_close = self.prev_close, close
+        if prev_close is None:
+            return NAN
+
+        delta = close - prev_close
+        if len(self.gains) == self.window:
+            self.gain_total -= self.gains[0]
+            self.loss_total -= self.losses[0]
+        self.gains.append(max(delta, 0.0))
+        self.losses.append(max(-delta, 0.0))
+        self.gain_total += self.gains[-1]
+        self.loss_total += self.losses[-1]
+
+        if len(self.gains) < self.window:
+            return NAN
+        # Running sums drift by a few ulps, so an all-zero window must be detected exactly
+        avg_gain = (self.gain_total if any(self.gains) else 0.0) / self.window
+        avg_loss = (self.loss_total if any(self.losses) else 0.0) / self.window
+        if avg_loss == 0:
+            return NAN if avg_gain == 0 else 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def to_state(self) -> dict:
+        return {
+            "prev_close": self.prev_close,
+            "gains": list(self.gains),
+            "losses": list(self.losses),
+            "gain_total": self.gain_total,
+            "loss_total": self.loss_total,
+        }
+
+    @classmethod
+    def from_state(cls, window: int, state: dict):
+        return cls(window, prev_close=state.get("prev_close"), gains=state.get("gains", ()),
+                   losses=state.get("losses", ()), gain_total=state.get("gain_total", 0.0),
+                   loss_total=state.get("loss_total", 0.0))
+
+
+class IncrementalMACD:
+    """MACD line, signal line and histogram, matching ``compute_macd``."""
+
+    name = "macd"
+
+    def __init__(self, params=(12, 26, 9), short_ema=None, long_ema=None, signal_ema=None):
+        short_window, long_window, signal_window = params
+        self.params = tuple(params)
+        self.short_ema = short_ema or IncrementalEMA(short_window)
+        self.long_ema = long_ema or IncrementalEMA(long_window)
+        self.signal_ema = signal_ema or IncrementalEMA(signal_window)
+
+    def update(self, close: float) -> tuple:
+        macd_line = self.short_ema.update(close) - self.long_ema.update(close)
+        signal_line = self.signal_ema.update(macd_line)
+        return macd_line, signal_line, macd_line - signal_line
+
+    def to_state(self) -> dict:
+        return {
+            "short": self.short_ema.value,
+            "long": self.long_ema.value,
+            "signal": self.signal_ema.value,
+        }
+
+    @classmethod
+    def from_state(cls, params, state: dict):
+        short_window, long_window, signal_window = params
+        return cls(
+            params,
+            short_ema=IncrementalEMA(short_window, value=state.get("short")),
+            long_ema=IncrementalEMA(long_window, value=state.get("long")),
+            signal_ema=IncrementalEMA(signal_window, value=state.get("signal")),
+        )
+
+
+INCREMENTAL_INDICATORS = {
+    cls.name: cls for cls in (IncrementalEMA, IncrementalSMA, IncrementalRSI, IncrementalMACD)
+}
+
+
+def create_indicator(name: str, params, state: dict = None):
+    """Build an incremental indicator, restoring it from a saved state if one is given."""
+    cls = INCREMENTAL_INDICATORS[name]
+    if name == "macd":
+        params = tuple(params)
+    if state is None:
+        return cls(params)
+    return cls.from_state(params, state)
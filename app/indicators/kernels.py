@@ -0,0 +1,193 @@
+"""
+Pure-NumPy indicator kernels.
+
+These are drop-in alternatives to the pandas implementations in this package,
+working on raw float64 arrays along axis 0 (a single series, or one column per
+symbol). They reproduce the pandas outputs including the NaN warmup, provided
+any missing values are a leading warmup: NaNs after a column's first valid
+value are not supported.
+"""
+import numpy as np
+import pandas as pd
+from flask import current_app, has_app_context
+
+BACKENDS = ("pandas", "numpy")
+
+# Largest growth of 1 / decay**k allowed inside one block of the EMA recurrence
+_EMA_BLOCK_RANGE = 1e8
+
+# Block length of the cumulative sums behind rolling windows, in windows
+_SUM_BLOCK_WINDOWS = 256
+
+
+def resolve_backend(backend: str = None) -> str:
+    """Return the backend to use: the one asked for, else ``INDICATOR_BACKEND``, else pandas."""
+    if backend is None and has_app_context():
+        backend = current_app.config.get("INDICATOR_BACKEND")
+    backend = backend or "pandas"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown indicator backend: {backend}")
+    return backend
+
+
+def wrap(like, values: np.ndarray):
+    """Give a kernel result the index (and columns) of the Series or DataFrame it was computed from."""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(values, index=like.index, columns=like.columns, copy=False)
+    return pd.Series(values, index=like.index, name=like.name, copy=False)
+
+
+def _window_counts(mask: np.ndarray, window: int) -> np.ndarray:
+    """Number of True values in each trailing window, for windows ending at row window - 1 onwards."""
+    counts = np.cumsum(mask, axis=0, dtype=np.int64)
+    out = counts[window - 1:].copy()
+    out[1:] -= counts[:-window]
+    return out
+
+
+def _windowed_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sums of ``values[j - window + 1 : j + 1]`` for j >= window - 1, from cumulative sums.
+
+    The cumulative sums restart every ``_SUM_BLOCK_WINDOWS`` windows, so rounding
+    depends on the block length rather than the series length. A window
+    crossing into a new block adds back the previous block's total.
+    """
+    n = values.shape[0]
+    block = max(4096, window * _SUM_BLOCK_WINDOWS)
+
+    prefix = np.empty_like(values)
+    for lo in range(0, n, block):
+        np.cumsum(values[lo:lo + block], axis=0, out=prefix[lo:lo + block])
+
+    # prefix[end] - (prefix[start] - values[start]) when both ends are in the same block
+    sums = prefix[window - 1:] - prefix[:n - window + 1]
+    sums += values[:n - window + 1]
+    for lo in range(block, n, block):
+        sums[lo - window + 1:min(lo, n - window + 1)] += prefix[lo - 1]
+    return sums
+
+
+def _rolling_sum(values: np.ndarray, window: int, exact_zeros: bool = False) -> np.ndarray:
+    """
+    Sum over the trailing ``window`` values; NaN until a window holds
+    ``window`` valid values, like ``rolling(window).sum()``.
+
+    With ``exact_zeros`` a window of only zeros sums to exactly 0 instead of
+    the rounding residue left by differencing cumulative sums.
+    """
+    n = values.shape[0]
+    out = np.full(values.shape, np.nan)
+    if window > n:
+        return out
+
+    missing = np.isnan(values)
+    has_missing = missing.any()
+    filled = np.where(missing, 0.0, values) if has_missing else values
+
+    sums = _windowed_sum(filled, window)
+    if exact_zeros:
+        sums[_window_counts(filled != 0, window) == 0] = 0.0
+    if has_missing:
+        sums[_window_counts(missing, window) > 0] = np.nan
+    out[window - 1:] = sums
+    return out
+
+
+def sma(close: np.ndarray, window: int) -> np.ndarray:
+    close = np.asarray(close, dtype=np.float64)
+    out = _rolling_sum(close, window)
+    out /= window
+    return out
+
+
+def ema(close: np.ndarray, span: int) -> np.ndarray:
+    """
+    EMA with ``adjust=False``: y[0] = x[0], y[t] = (1 - a) * y[t-1] + a * x[t].
+
+    The recurrence is solved in blocks. Inside a block it is a cumulative sum of
+    rescaled inputs; blocks are sized so the rescaling stays below
+    ``_EMA_BLOCK_RANGE``. The carry into a block decays by that same factor per
+    block, so it only needs the last few block ends to be exact in float64.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    if n == 0:
+        return close.copy()
+
+    alpha = 2 / (span + 1)
+    decay = 1 - alpha
+
+    # Start every column at its first valid value, then blank the warmup again
+    warmup = None
+    if np.isnan(close[0]).any():
+        first = (~np.isnan(close)).argmax(axis=0)
+        warmup = np.arange(n).reshape((n,) + (1,) * (close.ndim - 1)) < first
+        close = np.where(warmup, np.take_along_axis(close, np.expand_dims(first, 0), axis=0), close)
+
+    if decay == 0:
+        out = close.copy()
+    else:
+        block = max(1, min(n, int(np.log(_EMA_BLOCK_RANGE) / -np.log(decay))))
+        n_blocks = -(-n // block)
+        powers = decay ** np.arange(block + 1)
+        shape = (1, block) + (1,) * (close.ndim - 1)
+
+        flat = np.zeros((n_blocks * block,) + close.shape[1:])
+        np.multiply(close, alpha, out=flat[:n])
+        flat[0] = close[0]
+        blocks = flat.reshape((n_blocks, block) + close.shape[1:])
+
+        # y inside each block assuming nothing carried in: decay**j * cumsum(term_k / decay**k)
+        blocks /= powers[:block].reshape(shape)
+        np.cumsum(blocks, axis=1, out=blocks)
+        blocks *= powers[:block].reshape(shape)
+
+        if n_blocks > 1:
+            # Carry into block i: sum over k >= 1 of decay_per_block**(k - 1) * (end of block i - k)
+            ends = blocks[:, -1].copy()
+            per_block = powers[block]
+            n_terms = min(n_blocks - 1, int(np.ceil(np.log(np.finfo(np.float64).eps) / np.log(per_block))) + 1)
+            carry = np.zeros_like(ends)
+            for k in range(1, n_terms + 1):
+                carry[k:] += per_block ** (k - 1) * ends[:-k]
+            blocks += powers[1:].reshape(shape) * np.expand_dims(carry, 1)
+
+        out = flat[:n]
+
+    if warmup is not None:
+        out[warmup] = np.nan
+    return out
+
+
+def macd(close: np.ndarray, short_window: int = 12, long_window: int = 26, signal_window: int = 9) -> tuple:
+    macd_line = ema(close, short_window) - ema(close, long_window)
+    signal_line = ema(macd_line, signal_window)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    RSI from simple moving averages of gains and losses, like ``compute_rsi``.
+
+    Only gains go through a rolling sum: over a window, losses add up to the
+    gains minus the net price change, which is a single subtraction.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    n = close.shape[0]
+    out = np.full(close.shape, np.nan)
+    if window >= n:
+        return out
+
+    delta = np.empty(close.shape)
+    delta[0] = np.nan
+    np.subtract(close[1:], close[:-1], out=delta[1:])
+
+    gain_sum = _rolling_sum(np.maximum(delta, 0.0), window, exact_zeros=True)[window:]
+    loss_sum = gain_sum - (close[window:] - close[:-window])
+    # Windows without a single fall have exactly no losses
+    loss_sum[_window_counts(delta < 0, window)[1:] == 0] = 0.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[window:] = 100 - (100 / (1 + gain_sum / loss_sum))
+    return out
@@ -1,6 +1,11 @@
 import pandas as pd
+from app.indicators import kernels
+
+def compute_macd(close_prices: pd.Series, short_window=12, long_window=26, signal_window=9, backend: str = None):
+    if kernels.resolve_backend(backend) == "numpy":
+        lines = kernels.macd(close_prices.to_numpy(dtype="float64"), short_window, long_window, signal_window)
+        return tuple(kernels.wrap(close_prices, line) for line in lines)
 
-def compute_macd(close_prices: pd.Series, short_window=12, long_window=26, signal_window=9):
     short_ema = close_prices.ewm(span=short_window, adjust=False).mean()
     long_ema = close_prices.ewm(span=long_window, adjust=False).mean()
     
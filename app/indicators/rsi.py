@@ -1,6 +1,10 @@
 import pandas as pd
+from app.indicators import kernels
+
+def compute_rsi(close_prices: pd.Series, window: int = 14, backend: str = None) -> pd.Series:
+    if kernels.resolve_backend(backend) == "numpy":
+        return kernels.wrap(close_prices, kernels.rsi(close_prices.to_numpy(dtype="float64"), window))
 
-def compute_rsi(close_prices: pd.Series, window: int = 14) -> pd.Series:
     delta = close_prices.diff()
     gain = delta.clip(lower=0)
     loss = -delta.clip(upper=0)
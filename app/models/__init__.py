@@ -1,3 +1,5 @@
 from .stock import Stock
 from .price_history import PriceHistory
 from .user import User
+from .indicator_state import IndicatorState
+from .indicator_value import IndicatorValue
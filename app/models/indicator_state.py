@@ -0,0 +1,20 @@
+from app.extensions import db
+from app.models.base import BaseModel
+
+class IndicatorState(BaseModel):
+    __tablename__ = 'indicator_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(10), nullable=False)
+    indicator = db.Column(db.String(16), nullable=False)
+    params = db.Column(db.String(32), nullable=False)
+    state = db.Column(db.JSON, nullable=False)
+    last_date = db.Column(db.Date, nullable=False)
+    bar_count = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('symbol', 'indicator', 'params', name='uq_indicator_state'),
+    )
+
+    def __repr__(self):
+        return f"<IndicatorState {self.symbol} {self.indicator}({self.params}) @ {self.last_date}>"
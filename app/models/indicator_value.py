@@ -0,0 +1,20 @@
+from app.extensions import db
+from app.models.base import BaseModel
+
+class IndicatorValue(BaseModel):
+    __tablename__ = 'indicator_values'
+
+    id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(10), nullable=False)
+    indicator = db.Column(db.String(16), nullable=False)
+    params = db.Column(db.String(32), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    value = db.Column(db.Float, nullable=True)
+    values = db.Column(db.JSON, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('symbol', 'indicator', 'params', 'date', name='uq_indicator_value'),
+    )
+
+    def __repr__(self):
+        return f"<IndicatorValue {self.symbol} {self.indicator}({self.params}) - {self.date}>"
@@ -7,6 +7,8 @@ class Stock(BaseModel):
     id = db.Column(db.Integer, primary_key=True)
     symbol = db.Column(db.String(10), unique=True, nullable=False)
     name = db.Column(db.String(128), nullable=True)
+    # Last time bars were inserted or overwritten, see ``get_data_version``
+    prices_updated_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
     def __repr__(self):
         return f"<Stock {self.symbol}>"
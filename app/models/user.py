@@ -1,4 +1,5 @@
-from app.extensions import db
+from sqlalchemy import event
+from app.extensions import db, principal_cache
 from werkzeug.security import generate_password_hash, check_password_hash
 from app.models.base import BaseModel
 from flask_jwt_extended import create_access_token
@@ -30,9 +31,16 @@ class User(BaseModel, UserMixin):
 
     @staticmethod
     def generate_token(user: 'User') -> str:
-        """Generate a JWT for a user."""
+        """Generate a JWT for a user, carrying the claims ``claims_required`` authorizes from."""
         expires = timedelta(hours=12)
-        return create_access_token(identity=user.id, expires_delta=expires)
+        return create_access_token(identity=str(user.id), expires_delta=expires,
+                                   additional_claims={"email": user.email, "name": user.name})
 
     def __repr__(self) -> str:
         return f"<User {self.email}>"
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target):
+    principal_cache.invalidate(target.id)
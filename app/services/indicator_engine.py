@@ -0,0 +1,87 @@
+import numpy as np
+from flask import current_app
+
+from app.extensions import db
+from app.indicators.incremental import create_indicator, params_key
+from app.models import IndicatorState
+from app.utils.data_loader import get_data_version, load_price_columns
+
+
+def default_indicator_specs() -> list:
+    """
+    Indicator parameter sets configured in ``DEFAULT_INDICATOR_PARAMS``.
+
+    Returns:
+        list: [(indicator name, params), ...] like [('rsi', 14), ('macd', (12, 26, 9))]
+    """
+    specs = []
+    for name, param_sets in current_app.config["DEFAULT_INDICATOR_PARAMS"].items():
+        for params in param_sets:
+            specs.append((name, tuple(params) if isinstance(params, (list, tuple)) else params))
+    return specs
+
+
+def advance_indicator_states(symbol: str, specs: list = None, commit: bool = True) -> dict:
+    """
+    Bring the saved indicator states of a symbol up to its latest stored bar.
+
+    Each state is advanced only over the bars stored after its ``last_date``.
+    A state whose bar count no longer adds up (e.g. older bars were backfilled)
+    or that does not exist yet is rebuilt from the full history.
+
+    Args:
+        symbol (str): Stock symbol
+        specs (list): [(indicator name, params), ...], defaults to ``default_indicator_specs()``
+        commit (bool): Commit the updated states, or leave that to the caller
+
+    Returns:
+        dict: {(indicator name, params key): (dates, values)} with the outputs for the
+              bars each state was advanced over, as a datetime64 array and a list
+    """
+    specs = specs if specs is not None else default_indicator_specs()
+    version = get_data_version(symbol)
+    if version is None or not specs:
+        return {}
+    latest, count, _ = version
+
+    saved = {(row.indicator, row.params): row for row in IndicatorState.query.filter_by(symbol=symbol).all()}
+    rows = [saved.get((name, params_key(params))) for name, params in specs]
+
+    start = None if None in rows else min(row.last_date for row in rows)
+    new_bars = _load_closes(symbol, after=start)
+    full_history = new_bars if start is None else None
+
+    results = {}
+    for (name, params), row in zip(specs, rows):
+        dates, closes = new_bars
+        offset = 0
+        if row is not None:
+            offset = int(np.searchsorted(dates, np.datetime64(row.last_date, "ns"), side="right"))
+
+        resumable = row is not None and row.bar_count + len(dates) - offset == count
+        if not resumable:
+            if full_history is None:
+                full_history = _load_closes(symbol)
+            (dates, closes), offset = full_history, 0
+
+        indicator = create_indicator(name, params, row.state if resumable else None)
+        values = [indicator.update(close) for close in closes[offset:].tolist()]
+        results[(name, params_key(params))] = (dates[offset:], values)
+
+        if row is None:
+            row = IndicatorState(symbol=symbol, indicator=name, params=params_key(params))
+            db.session.add(row)
+        row.state = indicator.to_state()
+        row.last_date = latest
+        row.bar_count = count
+
+    if commit:
+        db.session.commit()
+    return results
+
+
+def _load_closes(symbol: str, after=None) -> tuple:
+    bars = load_price_columns(symbol, ("date", "close"), after=after)
+    if not bars:
+        return np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.float64)
+    return bars["date"], bars["close"]
@@ -1,57 +1,360 @@
+import math
+
+import numpy as np
 import pandas as pd
+from flask import current_app
 from app.indicators.rsi import compute_rsi
 from app.indicators.macd import compute_macd
 from app.indicators.ema import compute_ema
 from app.indicators.sma import compute_sma
-from app.utils.data_loader import get_price_history_df  # helper to load data
+from app.indicators.kernels import resolve_backend
+from app.extensions import indicator_cache
+from app.services.indicator_store import MACD_COMPONENTS, load_materialized_indicators
+from app.utils.columnar import date_column, value_column
+from app.utils.data_loader import get_data_version, get_price_history_df, get_price_range, load_close_panel  # helper to load data
+from app.utils.request_metrics import timed
 
-def calculate_indicators(symbol: str, indicators: dict) -> dict:
+def calculate_indicators(symbol: str, indicators: dict, backend: str = None,
+                         start=None, end=None, limit: int = None, date_format: str = None, version=None) -> dict:
     """
     Compute requested indicators for a stock symbol.
 
+    Results are shared between workers through the indicator result cache,
+    keyed on the symbol's current data version, the requested range and the
+    compute backend. Values materialized in ``indicator_values`` are used
+    unless a backend other than ``INDICATOR_BACKEND`` is asked for.
+
+    Args:
+        symbol (str): Stock symbol
+        indicators (dict): Dictionary like {'rsi': True, 'macd': True, 'sma': [20, 50], 'ema': [12, 26]}
+        backend (str): 'pandas' or 'numpy' compute backend, defaults to INDICATOR_BACKEND
+        start (date): Only return values from this date on
+        end (date): Only return values up to this date
+        limit (int): Only return the most recent ``limit`` values of the range
+        date_format (str): Return a columnar payload with dates as 'iso' strings or
+                           'epoch' days and missing values as NaN (see ``app.utils.columnar``)
+        version (tuple): Data version already looked up by the caller, if any
+
+    Returns:
+        dict: Computed indicator values in {'x': [...], 'y': [...]} format, or
+              {'date': [...], 'rsi': [...], 'sma': {'20': [...]}, ...} with ``date_format``
+    """
+    symbol = symbol.upper()
+    version = version or get_data_version(symbol)
+    if version is None:
+        return {"error": "No price data found for symbol"}
+
+    date_range = (start, end, limit)
+    return indicator_cache.get_or_compute(
+        symbol, indicators, version,
+        lambda: _compute_indicators(symbol, indicators, version, backend, date_range, date_format),
+        range=list(date_range) if any(value is not None for value in date_range) else None,
+        columnar=date_format,
+        backend=resolve_backend(backend),
+    )
+
+
+def requested_specs(indicators: dict) -> list:
+    """
+    Indicator parameter sets asked for by an indicators request.
+
+    Returns:
+        list: [(indicator name, params), ...] like [('rsi', 14), ('sma', 20)]
+    """
+    specs = []
+    if indicators.get('rsi'):
+        specs.append(('rsi', 14))
+    if indicators.get('macd'):
+        specs.append(('macd', (12, 26, 9)))
+    specs.extend(('sma', period) for period in indicators.get('sma') or [])
+    specs.extend(('ema', period) for period in indicators.get('ema') or [])
+    return specs
+
+
+def estimate_indicator_cost(bars: int, indicators: dict) -> int:
+    """
+    Rough cost of an indicators request: bars processed times the number of
+    series computed over them, MACD counting as its three EMAs. Compared with
+    ``INDICATOR_ASYNC_COST_THRESHOLD`` to decide whether a request runs as a
+    background job.
+
+    Args:
+        bars (int): Bars the request loads, over all symbols
+        indicators (dict): Dictionary like {'rsi': True, 'macd': True, 'sma': [20, 50], 'ema': [12, 26]}
+
+    Returns:
+        int: Estimated cost
+    """
+    series = sum(3 if name == 'macd' else 1 for name, _ in requested_specs(indicators))
+    return bars * series
+
+
+def _ema_warmup(span: int, tolerance: float) -> int:
+    # An EMA seeded k bars early is off by decay**k times the seed error
+    decay = 1 - 2 / (span + 1)
+    if decay <= 0:
+        return 0
+    return math.ceil(math.log(tolerance) / math.log(decay))
+
+
+def warmup_bars(specs: list, tolerance: float = None) -> int:
+    """
+    Number of bars needed before the first returned date for every requested
+    indicator to match its value computed over the full history.
+
+    Windowed indicators need exactly their window. EMAs depend on all earlier
+    bars, with a weight that decays geometrically; they get enough bars for the
+    starting value's weight to drop below ``tolerance``
+    (``INDICATOR_WARMUP_TOLERANCE``).
+
+    Args:
+        specs (list): [(indicator name, params), ...]
+        tolerance (float): Relative weight left on the seed of an EMA
+
+    Returns:
+        int: Number of warmup bars
+    """
+    if tolerance is None:
+        tolerance = current_app.config["INDICATOR_WARMUP_TOLERANCE"]
+
+    bars = 0
+    for name, params in specs:
+        if name == 'rsi':
+            bars = max(bars, params)
+        elif name == 'sma':
+            bars = max(bars, params - 1)
+        elif name == 'ema':
+            bars = max(bars, _ema_warmup(params, tolerance))
+        elif name == 'macd':
+            short_window, long_window, signal_window = params
+            bars = max(bars, max(_ema_warmup(short_window, tolerance), _ema_warmup(long_window, tolerance))
+                       + _ema_warmup(signal_window, tolerance))
+    return bars
+
+
+@timed("compute")
+def calculate_indicator_columns(symbol: str, indicators: dict, backend: str = None,
+                                start=None, end=None, limit: int = None, version=None) -> dict:
+    """
+    Compute requested indicators for a stock symbol as flat NumPy columns, for
+    binary encoding. These are not stored in the shared result cache, which
+    holds JSON payloads.
+
     Args:
         symbol (str): Stock symbol
         indicators (dict): Dictionary like {'rsi': True, 'macd': True, 'sma': [20, 50], 'ema': [12, 26]}
+        backend (str): 'pandas' or 'numpy' compute backend, defaults to INDICATOR_BACKEND
+        start (date): Only return values from this date on
+        end (date): Only return values up to this date
+        limit (int): Only return the most recent ``limit`` values of the range
+        version (tuple): Data version already looked up by the caller, if any
 
     Returns:
-        dict: Computed indicator values in {'x': [...], 'y': [...]} format
+        dict: {'date': datetime64 array, 'rsi': array, 'macd.macd_line': array, 'sma.20': array, ...}
     """
-    df = get_price_history_df(symbol.upper())
-    if df.empty or 'close' not in df.columns:
+    symbol = symbol.upper()
+    version = version or get_data_version(symbol)
+    if version is None:
         return {"error": "No price data found for symbol"}
 
-    # Ensure the index is datetime for plotting
-    if not pd.api.types.is_datetime64_any_dtype(df.index):
-        if 'date' in df.columns:
-            df.set_index(pd.to_datetime(df['date']), inplace=True)
+    index, series = _indicator_series(symbol, indicators, version, backend, (start, end, limit))
+    if index is None:
+        return series
+
+    columns = {"date": index.to_numpy()}
+    for name, params in requested_specs(indicators):
+        values = series(name, params)
+        if name == 'macd':
+            columns.update((f"macd.{component}", np.asarray(part, dtype=np.float64))
+                           for component, part in zip(MACD_COMPONENTS, values))
+        elif name == 'rsi':
+            columns['rsi'] = np.asarray(values, dtype=np.float64)
         else:
-            return {"error": "Date column missing or index not datetime"}
+            columns[f"{name}.{params}"] = np.asarray(values, dtype=np.float64)
+    return columns
+
+
+def _indicator_series(symbol: str, indicators: dict, version, backend: str = None, date_range: tuple = None):
+    """
+    Returns:
+        tuple: (DatetimeIndex of the returned bars, series(name, params) giving each
+               requested indicator's values over them), or (None, error dict)
+    """
+    specs = requested_specs(indicators)
+    start, end, limit = date_range or (None, None, None)
+    # Materialized values come from the incremental states, not from either backend
+    use_stored = resolve_backend(backend) == resolve_backend()
+
+    df = None
+    skip = 0
+    if start is None and end is None and limit is None:
+        stored = load_materialized_indicators(symbol, specs, version) if use_stored else {}
+        if not specs or any(spec not in stored for spec in specs):
+            df = get_price_history_df(symbol, version)
+            if df.empty or 'close' not in df.columns:
+                return None, {"error": "No price data found for symbol"}
+    else:
+        # Only the requested bars plus enough earlier ones to warm the indicators up
+        df, skip = get_price_range(symbol, ('date', 'close'), start, end, limit,
+                                   warmup=warmup_bars(specs), version=version)
+        stored = load_materialized_indicators(symbol, specs, version, df['date'].to_numpy()[skip:]) if use_stored else {}
+
+    if df is not None:
+        # Ensure the index is datetime for plotting
+        if not pd.api.types.is_datetime64_any_dtype(df.index):
+            if 'date' in df.columns:
+                df.set_index(pd.to_datetime(df['date']), inplace=True)
+            else:
+                return None, {"error": "Date column missing or index not datetime"}
+        index = df.index[skip:]
+    else:
+        index = pd.DatetimeIndex(stored[specs[0]][0])
+
+    def series(name, params):
+        if (name, params) in stored:
+            return stored[(name, params)][1]
+        if name == 'rsi':
+            return compute_rsi(df['close'], params, backend=backend).iloc[skip:]
+        if name == 'macd':
+            return tuple(part.iloc[skip:] for part in compute_macd(df['close'], *params, backend=backend))
+        if name == 'sma':
+            return compute_sma(df['close'], params, backend=backend).iloc[skip:]
+        return compute_ema(df['close'], params, backend=backend).iloc[skip:]
 
-    dates = df.index.strftime("%Y-%m-%d").tolist()
-    result = {"x": dates}
+    return index, series
+
+
+@timed("compute")
+def _compute_indicators(symbol: str, indicators: dict, version, backend: str = None,
+                        date_range: tuple = None, date_format: str = None) -> dict:
+    index, series = _indicator_series(symbol, indicators, version, backend, date_range)
+    if index is None:
+        return series
+
+    if date_format is None:
+        def column(values):
+            return {"y": pd.Series(values, dtype='float64').fillna("").tolist()}
+
+        result = {"x": index.strftime("%Y-%m-%d").tolist()}
+    else:
+        column = value_column
+        result = {"date": date_column(index, date_format)}
 
     if indicators.get('rsi'):
-        rsi_series = compute_rsi(df['close']).fillna("")
-        result['rsi'] = {"y": rsi_series.tolist()}
+        result['rsi'] = column(series('rsi', 14))
 
     if indicators.get('macd'):
-        macd_line, signal_line, hist = compute_macd(df['close'])
+        macd_line, signal_line, hist = series('macd', (12, 26, 9))
         result['macd'] = {
-            "macd_line": {"y": macd_line.fillna("").tolist()},
-            "signal_line": {"y": signal_line.fillna("").tolist()},
-            "histogram": {"y": hist.fillna("").tolist()},
+            "macd_line": column(macd_line),
+            "signal_line": column(signal_line),
+            "histogram": column(hist),
         }
 
     if sma_periods := indicators.get('sma'):
         result['sma'] = {}
         for period in sma_periods:
-            sma_series = compute_sma(df['close'], period).fillna("")
-            result['sma'][str(period)] = {"y": sma_series.tolist()}
+            result['sma'][str(period)] = column(series('sma', period))
 
     if ema_periods := indicators.get('ema'):
         result['ema'] = {}
         for period in ema_periods:
-            ema_series = compute_ema(df['close'], period).fillna("")
-            result['ema'][str(period)] = {"y": ema_series.tolist()}
+            result['ema'][str(period)] = column(series('ema', period))
+
+    return result
+
+
+def _panel_columns_with_gaps(panel: pd.DataFrame) -> list:
+    """Columns with missing dates between their first and last bar."""
+    valid = panel.notna().to_numpy()
+    first = valid.argmax(axis=0)
+    last = len(panel) - 1 - valid[::-1].argmax(axis=0)
+    gaps = valid.sum(axis=0) != (last - first + 1)
+    return list(panel.columns[gaps])
+
+
+@timed("compute")
+def calculate_batch_indicators(symbols: list, indicators: dict, backend: str = None) -> dict:
+    """
+    Compute the same indicators for many stock symbols at once.
+
+    Closing prices are loaded with one query into a date x symbol panel and each
+    indicator is computed once over all columns. A symbol whose bars have gaps
+    against the shared calendar is computed on its own series, so results always
+    match ``calculate_indicators``.
+
+    Args:
+        symbols (list): Stock symbols
+        indicators (dict): Dictionary like {'rsi': True, 'macd': True, 'sma': [20, 50], 'ema': [12, 26]}
+        backend (str): 'pandas' or 'numpy' compute backend, defaults to INDICATOR_BACKEND
+
+    Returns:
+        dict: {symbol: computed indicator values in {'x': [...], 'y': [...]} format}
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    panel = load_close_panel(symbols)
+
+    # Format the shared calendar once rather than once per symbol
+    labels = np.asarray(panel.index.strftime("%Y-%m-%d")) if not panel.empty else None
+    positions = pd.Series(np.arange(len(panel)), index=panel.index)
+
+    gappy = _panel_columns_with_gaps(panel) if not panel.empty else []
+    dense = panel.drop(columns=gappy)
+    frames = [dense] + [panel[[symbol]].dropna() for symbol in gappy]
+
+    computed = {}
+    for frame in frames:
+        if frame.empty:
+            continue
+        # The compute_* functions are column-wise, so a whole panel goes through in one call
+        outputs = {}
+        if indicators.get('rsi'):
+            outputs['rsi'] = compute_rsi(frame, backend=backend)
+        if indicators.get('macd'):
+            outputs['macd'] = compute_macd(frame, backend=backend)
+        for period in indicators.get('sma') or []:
+            outputs[('sma', period)] = compute_sma(frame, period, backend=backend)
+        for period in indicators.get('ema') or []:
+            outputs[('ema', period)] = compute_ema(frame, period, backend=backend)
+
+        rows = positions[frame.index].to_numpy()
+        for symbol in frame.columns:
+            valid = frame[symbol].notna().to_numpy()
+            computed[symbol] = (rows[valid], valid, outputs)
+
+    def to_list(frame, symbol, valid):
+        return frame[symbol][valid].fillna("").tolist()
+
+    result = {}
+    for symbol in symbols:
+        if symbol not in computed:
+            result[symbol] = {"error": "No price data found for symbol"}
+            continue
+
+        rows, valid, outputs = computed[symbol]
+        data = {"x": labels[rows].tolist()}
+
+        if indicators.get('rsi'):
+            data['rsi'] = {"y": to_list(outputs['rsi'], symbol, valid)}
+
+        if indicators.get('macd'):
+            macd_line, signal_line, hist = outputs['macd']
+            data['macd'] = {
+                "macd_line": {"y": to_list(macd_line, symbol, valid)},
+                "signal_line": {"y": to_list(signal_line, symbol, valid)},
+                "histogram": {"y": to_list(hist, symbol, valid)},
+            }
+
+        if sma_periods := indicators.get('sma'):
+            data['sma'] = {
+                str(period): {"y": to_list(outputs[('sma', period)], symbol, valid)} for period in sma_periods
+            }
+
+        if ema_periods := indicators.get('ema'):
+            data['ema'] = {
+                str(period): {"y": to_list(outputs[('ema', period)], symbol, valid)} for period in ema_periods
+            }
+
+        result[symbol] = data
 
     return result
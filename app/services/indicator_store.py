@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, func, or_, select
+
+from app.extensions import db
+from app.indicators.incremental import params_key
+from app.models import IndicatorState, IndicatorValue
+from app.services.indicator_engine import advance_indicator_states, default_indicator_specs
+from app.utils.request_metrics import timed
+
+MACD_COMPONENTS = ("macd_line", "signal_line", "histogram")
+
+
+def _nullable(value: float):
+    return None if np.isnan(value) else value
+
+
+def materialize_indicators(symbol: str, specs: list = None) -> int:
+    """
+    Write the indicator values of a symbol's newly stored bars to ``indicator_values``.
+
+    Values are produced by advancing the saved indicator states, so only new
+    bars are computed. A state that is ahead of or behind the materialized rows
+    (e.g. the table was added after the state, or a write was lost) is dropped
+    first so that the series is rebuilt from the full history.
+
+    Args:
+        symbol (str): Stock symbol
+        specs (list): [(indicator name, params), ...], defaults to ``default_indicator_specs()``
+
+    Returns:
+        int: Number of indicator rows written
+    """
+    specs = specs if specs is not None else default_indicator_specs()
+    table = IndicatorValue.__table__
+
+    materialized_until = dict(
+        ((indicator, params), last_date)
+        for indicator, params, last_date in db.session.execute(
+            select(table.c.indicator, table.c.params, func.max(table.c.date))
+            .where(table.c.symbol == symbol)
+            .group_by(table.c.indicator, table.c.params)
+        ).all()
+    )
+    for state in IndicatorState.query.filter_by(symbol=symbol).all():
+        if materialized_until.get((state.indicator, state.params)) != state.last_date:
+            db.session.delete(state)
+
+    written = 0
+    for (indicator, params), (dates, values) in advance_indicator_states(symbol, specs, commit=False).items():
+        if not len(dates):
+            continue
+
+        dates = dates.astype("datetime64[D]").tolist()
+        db.session.execute(table.delete().where(
+            table.c.symbol == symbol, table.c.indicator == indicator,
+            table.c.params == params, table.c.date >= dates[0],
+        ))
+
+        if indicator == "macd":
+            rows = [{"values": dict(zip(MACD_COMPONENTS, value)), "value": None} for value in values]
+        else:
+            rows = [{"value": _nullable(value), "values": None} for value in values]
+        for row, date in zip(rows, dates):
+            row.update(symbol=symbol, indicator=indicator, params=params, date=date)
+
+        db.session.execute(table.insert(), rows)
+        written += len(rows)
+
+    db.session.commit()
+    return written
+
+
+def reset_materialized_indicators(symbol: str) -> None:
+    """
+    Drop a symbol's saved indicator states and materialized values, so the next
+    ``materialize_indicators`` rebuilds them from the full history. Needed when
+    stored bars are overwritten rather than appended. The caller commits.
+    """
+    db.session.execute(IndicatorState.__table__.delete().where(IndicatorState.__table__.c.symbol == symbol))
+    db.session.execute(IndicatorValue.__table__.delete().where(IndicatorValue.__table__.c.symbol == symbol))
+
+
+@timed("load")
+def load_materialized_indicators(symbol: str, specs: list, version, dates=None) -> dict:
+    """
+    Load materialized values for the requested indicators that are up to date
+    with the symbol's stored prices.
+
+    Args:
+        symbol (str): Stock symbol
+        specs (list): [(indicator name, params), ...] requested by the caller
+        version (tuple): (latest date, row count, prices updated at) from ``get_data_version``
+        dates (np.ndarray): Only load the values of these consecutive bars (datetime64),
+                            defaults to the whole history
+
+    Returns:
+        dict: {(indicator name, params): (dates, values)} for the specs that could be
+              served, with dates as a datetime64 array and values as a float array,
+              or a tuple of three arrays for MACD
+    """
+    defaults = set(default_indicator_specs())
+    wanted = [(name, params) for name, params in specs if (name, params) in defaults]
+    if not wanted or (dates is not None and not len(dates)):
+        return {}
+
+    table = IndicatorValue.__table__
+    latest, count = np.datetime64(version[0], "ns"), version[1]
+
+    def series_filter(specs):
+        return or_(*[
+            and_(table.c.indicator == name, table.c.params == params_key(params))
+            for name, params in specs
+        ])
+
+    query = (
+        select(table.c.indicator, table.c.params, table.c.date, table.c.value, table.c["values"])
+        .where(table.c.symbol == symbol)
+        .order_by(table.c.indicator, table.c.params, table.c.date)
+    )
+    if dates is not None:
+        # Coverage is checked on the whole series, then only the requested bars are read
+        complete = {
+            (name, key)
+            for name, key, rows, last_date in db.session.connection().execute(
+                select(table.c.indicator, table.c.params, func.count(), func.max(table.c.date))
+                .where(table.c.symbol == symbol, series_filter(wanted))
+                .group_by(table.c.indicator, table.c.params)
+            ).all()
+            if rows == count and np.datetime64(last_date, "ns") == latest
+        }
+        wanted = [(name, params) for name, params in wanted if (name, params_key(params)) in complete]
+        if not wanted:
+            return {}
+        first_date, last_date = (pd.Timestamp(dates[i]).date() for i in (0, -1))
+        query = query.where(table.c.date.between(first_date, last_date))
+        latest, count = dates[-1], len(dates)
+
+    rows = db.session.connection().execute(query.where(series_filter(wanted))).all()
+    if not rows:
+        return {}
+
+    indicators, params, row_dates, values, components = zip(*rows)
+    keys = np.array([f"{name}:{key}" for name, key in zip(indicators, params)])
+    row_dates = np.array(row_dates, dtype="datetime64[ns]")
+    values = np.array(values, dtype=np.float64)
+
+    result = {}
+    for name, spec_params in wanted:
+        index = np.flatnonzero(keys == f"{name}:{params_key(spec_params)}")
+        # Only serve series that cover exactly the bars asked for
+        if len(index) != count or row_dates[index[-1]] != latest:
+            continue
+
+        if name == "macd":
+            result[(name, spec_params)] = (row_dates[index], tuple(
+                np.array([components[i][component] for i in index], dtype=np.float64)
+                for component in MACD_COMPONENTS
+            ))
+        else:
+            result[(name, spec_params)] = (row_dates[index], values[index])
+
+    return result
@@ -0,0 +1,182 @@
+"""
+Market data providers behind ``fetch_and_store_stock_data``.
+
+A provider returns daily bars shaped like yfinance's ``Ticker.history()``: a
+frame indexed by tz-aware timestamps with Open/High/Low/Close/Volume columns.
+``MARKET_DATA_PROVIDER`` selects one:
+
+    yfinance  downloads from Yahoo Finance (the default)
+    replay    serves CSV/Parquet fixtures from ``MARKET_DATA_REPLAY_DIR``, or a
+              deterministic synthetic series for symbols without a fixture,
+              with optional latency and error injection for offline
+              benchmarks and load tests
+
+Providers are called from the fetcher's download threads, so ``history``
+must be thread-safe.
+"""
+import os
+import random
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+HISTORY_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class ProviderError(Exception):
+    pass
+
+
+class MarketDataProvider(ABC):
+    name = None
+
+    @abstractmethod
+    def history(self, symbol: str, start: date = None, period: str = "1y") -> pd.DataFrame:
+        """
+        Daily bars for a symbol.
+
+        Args:
+            symbol (str): Stock symbol
+            start (date): First date to return, overrides ``period``
+            period (str): How far back to go without ``start``, e.g. '1y', '6mo', '30d' or 'max'
+
+        Returns:
+            DataFrame: Open/High/Low/Close/Volume indexed by tz-aware timestamp, empty if unknown
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def __init__(self):
+        import yfinance
+
+        self._yf = yfinance
+
+    def history(self, symbol: str, start: date = None, period: str = "1y") -> pd.DataFrame:
+        ticker = self._yf.Ticker(symbol)
+        if start:
+            return ticker.history(start=start)
+        return ticker.history(period=period)
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Offline provider replaying ``<SYMBOL>.csv`` or ``<SYMBOL>.parquet`` fixtures
+    (a date column or index plus open/high/low/close/volume in any case).
+
+    Symbols without a fixture get a synthetic random walk of business days
+    from ``synthetic_start`` to today, seeded by the symbol and ``seed``, so
+    every run and every worker sees the same bars. Each call sleeps
+    ``latency`` plus up to ``jitter`` seconds and fails with probability
+    ``error_rate``.
+    """
+
+    name = "replay"
+    timezone = "America/New_York"
+
+    def __init__(self, fixture_dir: str = None, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0, synthetic_start: date = date(2000, 1, 3)):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.synthetic_start = synthetic_start
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def history(self, symbol: str, start: date = None, period: str = "1y") -> pd.DataFrame:
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ProviderError(f"Injected failure for {symbol}")
+
+        frame = self._fixture(symbol)
+        if frame is None:
+            frame = self._synthetic(symbol)
+        if frame.empty:
+            return frame
+        first = pd.Timestamp(start) if start else _period_start(period, frame.index[-1])
+        if first is not None:
+            frame = frame[frame.index.tz_localize(None) >= first]
+        return frame
+
+    def _fixture(self, symbol: str):
+        if not self.fixture_dir:
+            return None
+        for extension, read in ((".parquet", pd.read_parquet), (".csv", pd.read_csv)):
+            path = os.path.join(self.fixture_dir, symbol.upper() + extension)
+            if os.path.exists(path):
+                return self._normalize(read(path))
+        return None
+
+    def _normalize(self, frame: pd.DataFrame) -> pd.DataFrame:
+        frame = frame.rename(columns=str.capitalize)
+        if "Date" in frame.columns:
+            frame = frame.set_index("Date")
+        index = pd.DatetimeIndex(pd.to_datetime(frame.index))
+        if index.tz is None:
+            index = index.tz_localize(self.timezone)
+        frame = frame.set_axis(index).sort_index()
+        if "Volume" not in frame.columns:
+            frame["Volume"] = np.nan
+        return frame[HISTORY_COLUMNS]
+
+    def _synthetic(self, symbol: str) -> pd.DataFrame:
+        days = np.arange(np.datetime64(self.synthetic_start, "D"), np.datetime64(date.today(), "D") + 1)
+        index = pd.DatetimeIndex(days[np.is_busday(days)]).tz_localize(self.timezone)
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.upper().encode())])
+        n_bars = len(index)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+        spread = np.abs(rng.normal(0, 0.005, n_bars)) * close
+        return pd.DataFrame({
+            "Open": close + rng.normal(0, 0.002, n_bars) * close,
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": rng.integers(10_000, 10_000_000, n_bars),
+        }, index=index)
+
+
+def _period_start(period: str, last: pd.Timestamp):
+    """First date covered by a yfinance-style period ending at ``last``, None for 'max'."""
+    if period == "max":
+        return None
+    for suffix, unit in (("mo", "months"), ("y", "years"), ("d", "days")):
+        if period.endswith(suffix):
+            amount = int(period[:-len(suffix)])
+            return last.tz_localize(None).normalize() - pd.DateOffset(**{unit: amount})
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def get_market_data_provider(config) -> MarketDataProvider:
+    """
+    Build the provider selected by ``MARKET_DATA_PROVIDER``.
+
+    Args:
+        config (dict): App config
+
+    Returns:
+        MarketDataProvider: Provider instance
+    """
+    name = config.get("MARKET_DATA_PROVIDER", "yfinance")
+    if name == YFinanceProvider.name:
+        return YFinanceProvider()
+    if name == ReplayProvider.name:
+        return ReplayProvider(
+            fixture_dir=config.get("MARKET_DATA_REPLAY_DIR"),
+            latency=config.get("MARKET_DATA_LATENCY", 0.0),
+            jitter=config.get("MARKET_DATA_LATENCY_JITTER", 0.0),
+            error_rate=config.get("MARKET_DATA_ERROR_RATE", 0.0),
+            seed=config.get("MARKET_DATA_SEED", 0),
+        )
+    raise ValueError(f"Unknown market data provider: {name}")
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models import PriceHistory, Stock
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+# Dialects with INSERT ... ON CONFLICT support in SQLAlchemy
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def price_rows_from_history(hist: pd.DataFrame, stock_id: int, symbol: str) -> list:
+    """
+    Convert a yfinance history frame into ``price_history`` rows with column
+    operations instead of a per-row ``iterrows`` loop.
+
+    Bars without a full set of prices are dropped, and if a date appears more
+    than once only its last bar is kept.
+
+    Args:
+        hist (DataFrame): yfinance history indexed by timestamp, with Open/High/Low/Close/Volume columns
+        stock_id (int): Id of the symbol's Stock row
+        symbol (str): Stock symbol
+
+    Returns:
+        list: One dict per bar, ready for an executemany insert
+    """
+    dates = pd.Series(hist.index.date, index=hist.index)
+    prices = hist[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float64)
+    keep = ~np.isnan(prices).any(axis=1) & ~dates.duplicated(keep="last").to_numpy()
+
+    volume = hist["Volume"].to_numpy(dtype=np.float64)[keep]
+    volumes = np.nan_to_num(volume).astype(np.int64).tolist()
+    for i in np.flatnonzero(np.isnan(volume)):
+        volumes[i] = None
+
+    columns = dict(zip(PRICE_FIELDS, prices[keep].T.tolist()))
+    return [
+        {"stock_id": stock_id, "symbol": symbol, "date": date, "open": open_, "high": high, "low": low,
+         "close": close, "volume": vol}
+        for date, open_, high, low, close, vol in zip(
+            dates.to_numpy()[keep].tolist(), columns["open"], columns["high"], columns["low"], columns["close"],
+            volumes,
+        )
+    ]
+
+
+def upsert_price_rows(symbol: str, rows: list, on_conflict: str = "nothing", stored_through=None) -> tuple:
+    """
+    Write price rows in one statement, skipping or overwriting bars whose
+    (symbol, date) is already stored instead of failing the whole batch.
+
+    Postgres and SQLite use ``INSERT ... ON CONFLICT (symbol, date) DO NOTHING``
+    (or ``DO UPDATE`` with ``on_conflict="update"``). Other databases get a
+    plain insert of the dates not stored yet. Counts come from one query of the
+    stored dates within the batch's date range, skipped when the caller knows
+    the whole batch is newer than anything stored. Any write also stamps
+    ``Stock.prices_updated_at``, which changes the symbol's data version even
+    when only stored bars were overwritten. The caller commits.
+
+    Args:
+        symbol (str): Stock symbol the rows belong to
+        rows (list): Rows from ``price_rows_from_history``
+        on_conflict (str): 'nothing' to keep stored bars, 'update' to overwrite them
+        stored_through (date): Last date stored for the symbol, if known (``date.min`` for none)
+
+    Returns:
+        tuple: (number of bars inserted, number of stored bars updated)
+    """
+    if not rows:
+        return 0, 0
+
+    table = PriceHistory.__table__
+    dates = [row["date"] for row in rows]
+    if stored_through is not None and min(dates) > stored_through:
+        existing = set()
+    else:
+        existing = set(db.session.execute(
+            select(table.c.date).where(table.c.symbol == symbol, table.c.date.between(min(dates), max(dates)))
+        ).scalars())
+    updated = sum(date in existing for date in dates)
+    inserted = len(rows) - updated
+
+    dialect_insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is None:
+        new_rows = [row for row in rows if row["date"] not in existing]
+        if new_rows:
+            db.session.execute(insert(table), new_rows)
+            _mark_prices_updated(symbol)
+        return inserted, 0
+
+    statement = dialect_insert(table)
+    if on_conflict == "update":
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.symbol, table.c.date],
+            set_={name: statement.excluded[name] for name in PRICE_FIELDS + ("volume",)},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[table.c.symbol, table.c.date])
+        updated = 0
+
+    db.session.execute(statement, rows)
+    if inserted or updated:
+        _mark_prices_updated(symbol)
+    return inserted, updated
+
+
+def _mark_prices_updated(symbol: str) -> None:
+    db.session.execute(
+        update(Stock.__table__).where(Stock.__table__.c.symbol == symbol)
+        .values(prices_updated_at=datetime.now(timezone.utc))
+    )
@@ -1,73 +1,224 @@
-import yfinance as yf
-from datetime import datetime
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.exc import IntegrityError
-from app.extensions import db
+from app.extensions import db, price_cache, indicator_cache
 from app.models import Stock, PriceHistory
+from app.services.indicator_store import materialize_indicators, reset_materialized_indicators
+from app.services.market_data import MarketDataProvider, get_market_data_provider
+from app.services.price_store import price_rows_from_history, upsert_price_rows
 import pandas as pd
 
 
-def fetch_and_store_stock_data(symbol: str = None):
+def _download_history(provider: MarketDataProvider, sym: str, start_date) -> tuple:
+    """
+    Download a symbol's bars after ``start_date`` (or its last year). Runs on a
+    pool thread, so it must not touch the database session.
+
+    Returns:
+        tuple: (history DataFrame or None, error or None, seconds spent)
+    """
+    started = time.perf_counter()
+    try:
+        if start_date:
+            hist = provider.history(sym, start=start_date + pd.Timedelta(days=1))  # Avoid duplicate
+        else:
+            hist = provider.history(sym, period="1y")
+        return hist, None, time.perf_counter() - started
+    except Exception as e:
+        return None, e, time.perf_counter() - started
+
+
+def _plan_fetch(symbols: list = None) -> tuple:
+    """
+    Look up what every symbol of a fetch needs before downloading: its Stock
+    id and the last date already stored. This takes one grouped ``max(date)``
+    query and one Stock query instead of a round trip per symbol. Symbols
+    without a Stock row get one in a single insert.
+
+    Args:
+        symbols (list): Symbols to fetch, None for every stored symbol
+
+    Returns:
+        tuple: (symbols, {symbol: stock id}, {symbol: last stored date}, set of symbols created)
+    """
+    stock_query = select(Stock.symbol, Stock.id)
+    last_query = select(PriceHistory.symbol, func.max(PriceHistory.date)).group_by(PriceHistory.symbol)
+    if symbols is not None:
+        stock_query = stock_query.where(Stock.symbol.in_(symbols))
+        last_query = last_query.where(PriceHistory.symbol.in_(symbols))
+
+    stock_ids = dict(db.session.execute(stock_query).all())
+    if symbols is None:
+        symbols = list(stock_ids)
+    created = {sym for sym in symbols if sym not in stock_ids}
+    if created:
+        db.session.execute(insert(Stock), [{"symbol": sym, "name": sym} for sym in created])
+        db.session.commit()
+        stock_ids.update(db.session.execute(
+            select(Stock.symbol, Stock.id).where(Stock.symbol.in_(created))
+        ).all())
+
+    last_dates = dict(db.session.execute(last_query).all())
+    return symbols, stock_ids, last_dates, created
+
+
+def _store_history(sym: str, stock_id: int, stored_through, hist: pd.DataFrame,
+                   refresh_derived: bool = True) -> tuple:
     """
-    Fetch historical stock data using yfinance and store it in the database.
-    If symbol is None, fetches for all symbols in the Stock table.
+    Upsert a downloaded frame and bring the symbol's caches and materialized
+    indicators up to date (the latter only with ``refresh_derived``). Runs on
+    the fetching thread, the only one writing.
+
+    Returns:
+        tuple: (bars inserted, bars updated)
     """
-    symbols = [symbol.upper()] if symbol else [s.symbol for s in Stock.query.all()]
-
-    for sym in symbols:
-        print(f"Fetching data for: {sym}")
-        ticker = yf.Ticker(sym)
-
-        last_price = PriceHistory.query.filter_by(symbol=sym).order_by(PriceHistory.date.desc()).first()
-        start_date = (last_price.date if last_price else None)
-
-
-        try:
-            if start_date:
-                hist = ticker.history(start=start_date + pd.Timedelta(days=1))  # Avoid duplicate
-            else:
-                hist = ticker.history(period="1y")
-        except Exception as e:
-            print(f"Failed to fetch data for {sym}: {e}")
-            continue
-
-        if hist.empty:
-            print(f"No data returned for symbol: {sym}")
-            continue
-
-
-        stock = Stock.query.filter_by(symbol=sym).first()
-        if not stock:
-            stock = Stock(symbol=sym, name=sym)
-            db.session.add(stock)
-            db.session.commit()
-
-        existing_dates = {
-            p.date for p in PriceHistory.query.filter_by(symbol=sym).all()
-        }
-
-        new_prices = []
-        for date, row in hist.iterrows():
-            date_obj = date.to_pydatetime().date()
-            if date_obj in existing_dates:
-                continue
-
-            price = PriceHistory(
-                stock_id=stock.id,
-                symbol=sym,
-                date=date_obj,
-                open=row["Open"],
-                high=row["High"],
-                low=row["Low"],
-                close=row["Close"],
-                volume=int(row["Volume"]) if not pd.isna(row["Volume"]) else None
-            )
-            new_prices.append(price)
-
-        if new_prices:
-            db.session.bulk_save_objects(new_prices)
-            try:
-                db.session.commit()
-                print(f"Saved {len(new_prices)} new records for {sym}")
-            except IntegrityError:
-                db.session.rollback()
-                print(f"Integrity error while saving price history for {sym}")
+    rows = price_rows_from_history(hist, stock_id, sym)
+    on_conflict = current_app.config["PRICE_UPSERT_ON_CONFLICT"]
+    try:
+        inserted, updated = upsert_price_rows(sym, rows, on_conflict=on_conflict,
+                                              stored_through=stored_through or date.min)
+        if updated:
+            # Overwritten bars invalidate the incremental indicator states
+            reset_materialized_indicators(sym)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        print(f"Integrity error while saving price history for {sym}")
+        return 0, 0
+
+    if len(rows) < len(hist):
+        print(f"Skipped {len(hist) - len(rows)} incomplete or duplicate bars for {sym}")
+    if not inserted and not updated:
+        return 0, 0
+
+    price_cache.invalidate(sym)
+    print(f"Saved {inserted} new and {updated} updated records for {sym}")
+
+    if refresh_derived:
+        refresh_derived_data(sym)
+    return inserted, updated
+
+
+def refresh_derived_data(sym: str) -> None:
+    """
+    Drop a symbol's shared indicator results and bring its materialized
+    indicators up to date after new bars were stored.
+    """
+    indicator_cache.invalidate(sym)
+    try:
+        written = materialize_indicators(sym)
+        print(f"Materialized {written} indicator values for {sym}")
+    except Exception as e:
+        db.session.rollback()
+        print(f"Failed to materialize indicators for {sym}: {e}")
+
+
+def fetch_and_store_stock_data(symbol: str = None, concurrency: int = None, symbols: list = None,
+                               refresh_derived: bool = True, provider: MarketDataProvider = None) -> dict:
+    """
+    Fetch historical stock data from the market data provider (``MARKET_DATA_PROVIDER``,
+    yfinance by default) and store it in the database.
+    If symbol is None, fetches for ``symbols`` or else all symbols in the Stock table.
+
+    Start dates come from one grouped query up front, see ``_plan_fetch``;
+    Stock rows it creates for unknown symbols are removed again if no bars
+    were stored for them.
+
+    Downloads run on a pool of ``concurrency`` threads (``FETCH_CONCURRENCY``).
+    Everything touching the database stays on the calling thread, which stores
+    each frame as soon as its download completes, so the fetch uses a single
+    connection however many downloads are in flight. At most twice
+    ``concurrency`` downloaded frames wait to be stored at any time.
+
+    Args:
+        symbol (str): Stock symbol, defaults to every stored symbol
+        concurrency (int): Maximum parallel downloads
+        symbols (list): Stock symbols to fetch when no single symbol is given
+        refresh_derived (bool): Invalidate indicator results and materialize indicators
+                                per stored symbol; pass False when the caller does it
+                                later, see ``refresh_derived_data``
+        provider (MarketDataProvider): Provider to download from instead of the configured one
+
+    Returns:
+        dict: Run summary with per-symbol timings, see ``print_fetch_summary``
+    """
+    if symbol:
+        symbols = [symbol.upper()]
+    symbols, stock_ids, last_dates, created = _plan_fetch(symbols)
+    concurrency = max(1, concurrency or current_app.config["FETCH_CONCURRENCY"])
+    provider = provider or get_market_data_provider(current_app.config)
+
+    started = time.perf_counter()
+    timings = {}
+    pending = {}
+    queue = iter(symbols)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetch") as pool:
+        while True:
+            for sym in queue:
+                print(f"Fetching data for: {sym}")
+                pending[pool.submit(_download_history, provider, sym, last_dates.get(sym))] = sym
+                if len(pending) >= 2 * concurrency:
+                    break
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                sym = pending.pop(future)
+                hist, error, download_seconds = future.result()
+                timing = timings[sym] = {"download": download_seconds, "store": 0.0, "inserted": 0,
+                                         "updated": 0, "status": "ok"}
+                if error is not None:
+                    print(f"Failed to fetch data for {sym}: {error}")
+                    timing["status"] = "failed"
+                    timing["error"] = str(error)
+                    continue
+                if hist.empty:
+                    print(f"No data returned for symbol: {sym}")
+                    timing["status"] = "empty"
+                    continue
+
+                store_started = time.perf_counter()
+                timing["inserted"], timing["updated"] = _store_history(
+                    sym, stock_ids[sym], last_dates.get(sym), hist, refresh_derived
+                )
+                timing["store"] = time.perf_counter() - store_started
+
+    unused = [stock_ids[sym] for sym in created if not timings.get(sym, {}).get("inserted")]
+    if unused:
+        db.session.execute(delete(Stock).where(Stock.id.in_(unused)))
+        db.session.commit()
+
+    summary = {
+        "symbols": len(symbols),
+        "elapsed": time.perf_counter() - started,
+        "concurrency": concurrency,
+        "provider": provider.name,
+        "timings": timings,
+    }
+    print_fetch_summary(summary)
+    return summary
+
+
+def print_fetch_summary(summary: dict) -> None:
+    timings = summary["timings"]
+    elapsed = summary["elapsed"] or float("nan")
+    counts = {status: sum(t["status"] == status for t in timings.values()) for status in ("ok", "empty", "failed")}
+    inserted = sum(t["inserted"] for t in timings.values())
+    updated = sum(t["updated"] for t in timings.values())
+    download = sum(t["download"] for t in timings.values())
+    store = sum(t["store"] for t in timings.values())
+
+    print(f"Fetched {summary['symbols']} symbols in {summary['elapsed']:.1f}s with concurrency "
+          f"{summary['concurrency']}: {counts['ok']} ok, {counts['empty']} empty, {counts['failed']} failed")
+    print(f"Throughput: {summary['symbols'] / elapsed:.2f} symbols/s, {(inserted + updated) / elapsed:.0f} bars/s "
+          f"({inserted} inserted, {updated} updated); download time {download:.1f}s, store time {store:.1f}s")
+    print("Slowest symbols:")
+    for sym, timing in sorted(timings.items(), key=lambda item: -(item[1]["download"] + item[1]["store"]))[:10]:
+        print(f"  {sym:<10} download {timing['download']:6.2f}s  store {timing['store']:6.2f}s  "
+              f"{timing['inserted']} inserted  {timing['status']}")
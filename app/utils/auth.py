@@ -1,7 +1,43 @@
 from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from functools import wraps
+from app.extensions import principal_cache
 from app.models.user import User
+from app.utils.principal_cache import Principal
+from app.utils.request_metrics import timed
+
+
+@timed("auth")
+def load_principal(user_id):
+    """Principal of a user id, through the principal cache."""
+    def load(uid):
+        user = User.query.get(uid)
+        return Principal.from_user(user) if user is not None else None
+
+    return principal_cache.get_or_load(user_id, load)
+
+
+def principal_from_claims(claims: dict):
+    """
+    Principal described by a verified token's claims, without touching the
+    database. Tokens issued without the user claims fall back to the cache.
+    """
+    if "email" in claims:
+        return Principal(id=int(claims["sub"]), email=claims["email"], name=claims.get("name"))
+    return load_principal(claims["sub"])
+
+
+@timed("auth")
+def principal_from_request():
+    """Principal of a request's ``Authorization: Bearer`` token, or None if it has no valid one."""
+    try:
+        verify_jwt_in_request()
+    except (JWTExtendedException, PyJWTError):
+        return None
+    return principal_from_claims(get_jwt())
+
 
 def token_required(f):
     @wraps(f)
@@ -10,7 +46,7 @@ def token_required(f):
 
         current_user_id = get_jwt_identity()
 
-        current_user = User.query.get(current_user_id)
+        current_user = load_principal(current_user_id)
 
         if current_user is None:
             return jsonify({"msg": "User not found"}), 404
@@ -24,3 +60,22 @@ def token_required(f):
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+
+def claims_required(f):
+    """
+    Like ``token_required``, but authorizes from the token's claims alone, so
+    no database or cache lookup happens. A user changed or deleted after the
+    token was issued keeps the token's view until it expires.
+    """
+    @wraps(f)
+    @jwt_required()
+    def decorated(*args, **kwargs):
+        current_user = principal_from_claims(get_jwt())
+
+        if current_user is None:
+            return jsonify({"msg": "User not found"}), 404
+
+        return f(current_user, *args, **kwargs)
+
+    return decorated
@@ -1,7 +1,12 @@
-from flask import jsonify
+import json
+
+from flask import Response, jsonify
 from typing import Any
 
+from app.utils.request_metrics import timed
+
 
+@timed("serialize")
 def send_json_response(http_status: int, response_status: bool, message_key: str, data: Any = None,
                        error: Any = None) -> tuple:
     """This method used to send JSON response in custom dir structure. Here, status represents boolean value true/false
@@ -13,3 +18,20 @@ def send_json_response(http_status: int, response_status: bool, message_key: str
         return jsonify({'status': response_status, 'message': message_key, 'data': data}), http_status
     else:
         return jsonify({'status': response_status, 'message': message_key, 'error': error}), http_status
+
+
+def send_raw_json_response(http_status: int, response_status: bool, message_key: str, data_json: str) -> tuple:
+    """Same envelope as send_json_response, with ``data`` given as an already serialized JSON string."""
+    body = '{"data":%s,"message":%s,"status":%s}' % (data_json, json.dumps(message_key), json.dumps(response_status))
+    return Response(body, mimetype="application/json"), http_status
+
+
+def send_binary_response(http_status: int, chunks: list, mimetype: str) -> tuple:
+    """
+    Send an already encoded binary body, given as a list of bytes-like chunks,
+    without joining it. WSGI servers only write ``bytes``, so each chunk is
+    copied into one as it is written.
+    """
+    response = Response((bytes(chunk) for chunk in chunks), mimetype=mimetype)
+    response.content_length = sum(memoryview(chunk).nbytes for chunk in chunks)
+    return response, http_status
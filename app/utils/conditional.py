@@ -0,0 +1,68 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+
+from flask import after_this_request, current_app, request
+
+from app.utils.constants import HttpStatusCode
+
+
+def data_version_etag(symbol: str, version, variant: str = "") -> str:
+    """
+    Validator for a response built from ``symbol``'s prices at ``version``,
+    given the current request's query parameters and ``variant`` (e.g. a
+    format negotiated from the Accept header).
+    """
+    parts = [symbol, str(version[0]), version[1], str(version[2]), variant, sorted(request.args.items(multi=True))]
+    return hashlib.sha1(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+
+def check_not_modified(symbol: str, version, variant: str = ""):
+    """
+    Answer a conditional GET from the symbol's data version alone, before any
+    price data is loaded.
+
+    The ETag covers the data version and the request parameters. Last-Modified
+    is when the symbol's bars were last written, or the latest bar's date for
+    symbols stored before that was recorded, in which case it cannot see rows
+    added before that date; as in RFC 9110, If-Modified-Since is only used
+    when no If-None-Match is sent. HTTP dates have one-second resolution, so
+    the ETag is the precise validator.
+    The validators are also added to the view's eventual 200 response.
+
+    Returns:
+        tuple: A 304 response if the client's copy is current, else None
+    """
+    etag = data_version_etag(symbol, version, variant)
+    last_modified = _last_modified(version)
+
+    @after_this_request
+    def add_validators(response):
+        if response.status_code in (200, 304):
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add("Accept")
+        return response
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since is not None:
+        not_modified = last_modified <= request.if_modified_since
+    else:
+        not_modified = False
+
+    if not_modified:
+        return current_app.response_class(), HttpStatusCode.NOT_MODIFIED.value
+    return None
+
+
+def _last_modified(version) -> datetime:
+    latest, _, updated_at = version
+    if updated_at is None:
+        return datetime(latest.year, latest.month, latest.day, tzinfo=timezone.utc)
+    if updated_at.tzinfo is None:
+        # SQLite returns the stored UTC time without its offset
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at.replace(microsecond=0)
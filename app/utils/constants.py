@@ -5,9 +5,12 @@ class HttpStatusCode(enum.Enum):
     """Enum for storing different http status code."""
     OK = '200'
     CREATED = '201'
+    ACCEPTED = '202'
+    NOT_MODIFIED = '304'
     BAD_REQUEST = '400'
     UNAUTHORIZED = '401'
     FORBIDDEN = '403'
     NOT_FOUND = '404'
     INTERNAL_SERVER_ERROR = '500'
+    SERVICE_UNAVAILABLE = '503'
     TOO_MANY_REQUESTS = '429'
\ No newline at end of file
@@ -1,32 +1,269 @@
+import numpy as np
 import pandas as pd
-from app.extensions import db
+from sqlalchemy import func, select
+
+from app.extensions import db, price_cache
 from app.models.price_history import PriceHistory
+from app.models.stock import Stock
+from app.utils.request_metrics import add_rows, timed
+
+PRICE_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+
+# date.toordinal() of 1970-01-01
+_EPOCH_ORDINAL = 719163
+
+
+def _price_history_query(symbol: str, columns=PRICE_COLUMNS, after=None, before=None,
+                         start=None, end=None, limit=None):
+    table = PriceHistory.__table__
+    query = select(*[table.c[name] for name in columns]).where(table.c.symbol == symbol)
+    if after is not None:
+        query = query.where(table.c.date > after)
+    if before is not None:
+        query = query.where(table.c.date < before)
+    if start is not None:
+        query = query.where(table.c.date >= start)
+    if end is not None:
+        query = query.where(table.c.date <= end)
+    if limit is not None:
+        # Newest first so the limit keeps the most recent bars; callers restore date order
+        return query.order_by(table.c.date.desc()).limit(limit)
+    return query.order_by(table.c.date.asc())
+
+
+def _to_array(name: str, values: tuple) -> np.ndarray:
+    """Convert one fetched column into a typed NumPy array."""
+    if name == 'date':
+        # Going through ordinals is much faster than letting NumPy convert date objects
+        days = np.fromiter((value.toordinal() for value in values), dtype=np.int64, count=len(values))
+        return (days - _EPOCH_ORDINAL).astype('datetime64[D]').astype('datetime64[ns]')
+    if name == 'volume' and None not in values:
+        return np.array(values, dtype=np.int64)
+    # Nullable columns end up as float64 with NaN, same as the DataFrame constructor does
+    return np.array(values, dtype=np.float64)
+
+
+def load_price_columns(symbol: str, columns=PRICE_COLUMNS, after=None, before=None,
+                       start=None, end=None, limit=None) -> dict:
+    """
+    Fetch price history for the given stock symbol as a dict of typed NumPy arrays.
+
+    Runs a Core select of only the requested columns, so no ORM objects or
+    per-row dicts are built along the way. All filters are applied in SQL.
+
+    Args:
+        symbol (str): Stock symbol
+        columns (tuple): Columns to load
+        after (date): Only load bars strictly after this date
+        before (date): Only load bars strictly before this date
+        start (date): Only load bars on or after this date
+        end (date): Only load bars on or before this date
+        limit (int): Only load the most recent ``limit`` bars matching the other filters
+
+    Returns:
+        dict: {column name: np.ndarray}, ordered by date. Empty dict if there is no data.
+    """
+    query = _price_history_query(symbol, columns, after, before, start, end, limit)
+    rows = db.session.connection().execute(query).all()
+    if not rows:
+        return {}
+    if limit is not None:
+        rows.reverse()
+
+    return {name: _to_array(name, values) for name, values in zip(columns, zip(*rows))}
 
-def get_price_history_df(symbol: str) -> pd.DataFrame:
+
+def stream_price_rows(symbol: str, columns=PRICE_COLUMNS, start=None, end=None, limit=None,
+                      batch_size: int = 5000):
+    """
+    Yield the price history of a symbol in date order as lists of row tuples,
+    read through a server-side cursor so only one batch is held in memory.
+
+    The generator keeps the session's connection busy until it is exhausted,
+    so callers streaming a response must keep the app context alive (e.g.
+    with ``stream_with_context``).
+
+    Args:
+        symbol (str): Stock symbol
+        columns (tuple): Columns to load
+        start (date): Only load bars on or after this date
+        end (date): Only load bars on or before this date
+        limit (int): Only load the most recent ``limit`` bars matching the other filters
+        batch_size (int): Rows fetched from the cursor at a time
+
+    Yields:
+        list: Up to ``batch_size`` row tuples with the requested columns
+    """
+    connection = db.session.connection()
+    if limit is not None:
+        # Turn the limit into a start date so the rows can be streamed oldest first
+        table = PriceHistory.__table__
+        query = select(table.c.date).where(table.c.symbol == symbol)
+        if start is not None:
+            query = query.where(table.c.date >= start)
+        if end is not None:
+            query = query.where(table.c.date <= end)
+        cutoff = connection.execute(query.order_by(table.c.date.desc()).offset(limit - 1).limit(1)).scalar()
+        if cutoff is not None:
+            start = cutoff
+
+    result = connection.execute(
+        _price_history_query(symbol, columns, start=start, end=end).execution_options(yield_per=batch_size)
+    )
+    for rows in result.partitions():
+        yield rows
+
+
+def load_price_history_df(symbol: str, columns=PRICE_COLUMNS) -> pd.DataFrame:
     """
     Fetch price history data from the database for the given stock symbol
-    and return it as a pandas DataFrame.
+    and return it as a pandas DataFrame, bypassing the price cache.
 
     Returns:
         DataFrame with columns: date, open, high, low, close, volume
     """
-    records = (
-        db.session.query(PriceHistory)
-        .filter(PriceHistory.symbol == symbol)
-        .order_by(PriceHistory.date.asc())
-        .all()
-    )
+    arrays = load_price_columns(symbol, columns)
+    if not arrays:
+        return pd.DataFrame()
+
+    return pd.DataFrame(arrays, copy=False)
+
+
+@timed("load")
+def get_data_version(symbol: str):
+    """
+    Return a cheap version stamp for a symbol's stored prices.
 
-    if not records:
+    The latest date and row count change when bars are added; the symbol's
+    ``prices_updated_at`` also changes when stored bars are overwritten.
+
+    Returns:
+        tuple: (latest date, row count, prices updated at or None), or None if the
+               symbol has no prices
+    """
+    table = PriceHistory.__table__
+    stocks = Stock.__table__
+    updated_at = select(stocks.c.prices_updated_at).where(stocks.c.symbol == symbol).scalar_subquery()
+    latest, count, updated_at = db.session.connection().execute(
+        select(func.max(table.c.date), func.count(), updated_at).where(table.c.symbol == symbol)
+    ).one()
+    if not count:
+        return None
+    return latest, count, updated_at
+
+
+@timed("load")
+def get_price_history_df(symbol: str, version=None) -> pd.DataFrame:
+    """
+    Return the price history DataFrame for the given stock symbol, served from
+    the per-worker price cache while the symbol's data version is unchanged.
+
+    Args:
+        symbol (str): Stock symbol
+        version (tuple): Data version already looked up by the caller, if any
+
+    Returns:
+        DataFrame with columns: date, open, high, low, close, volume
+    """
+    version = version or get_data_version(symbol)
+    if version is None:
         return pd.DataFrame()
 
-    data = [{
-        'date': record.date,
-        'open': record.open,
-        'high': record.high,
-        'low': record.low,
-        'close': record.close,
-        'volume': record.volume
-    } for record in records]
+    df = price_cache.get(symbol, version)
+    if df is None:
+        df = load_price_history_df(symbol)
+        price_cache.put(symbol, version, df)
+    add_rows(len(df))
+
+    # Callers may set an index or add columns; keep the cached frame untouched
+    return df.copy(deep=False)
+
+
+@timed("load")
+def get_price_range(symbol: str, columns=PRICE_COLUMNS, start=None, end=None, limit=None,
+                    warmup: int = 0, version=None) -> tuple:
+    """
+    Return the bars of a symbol between ``start`` and ``end`` (both inclusive),
+    optionally only the most recent ``limit`` of them, preceded by up to
+    ``warmup`` earlier bars for indicators that need history before the range.
+
+    A frame already in the per-worker price cache is sliced in memory;
+    otherwise only the requested bars are read from the database.
+
+    Args:
+        symbol (str): Stock symbol
+        columns (tuple): Columns to load, must include 'date'
+        start (date): First date of the range
+        end (date): Last date of the range
+        limit (int): Keep only the most recent ``limit`` bars of the range
+        warmup (int): Number of bars to load before the range
+        version (tuple): Data version already looked up by the caller, if any
+
+    Returns:
+        tuple: (DataFrame with the requested columns, number of leading warmup rows)
+    """
+    cached = price_cache.get(symbol, version) if version is not None else None
+    if cached is not None:
+        dates = cached['date'].to_numpy()
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'ns'), side='left'))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, 'ns'), side='right'))
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        lo = min(lo, hi)
+        first = max(0, lo - warmup)
+        return cached.iloc[first:hi][list(columns)].reset_index(drop=True), lo - first
+
+    arrays = load_price_columns(symbol, columns, start=start, end=end, limit=limit)
+    if not arrays:
+        return pd.DataFrame({name: _to_array(name, ()) for name in columns}, copy=False), 0
+
+    skip = 0
+    if warmup:
+        first_date = pd.Timestamp(arrays['date'][0]).date()
+        earlier = load_price_columns(symbol, columns, before=first_date, limit=warmup)
+        if earlier:
+            skip = len(earlier['date'])
+            arrays = {name: np.concatenate([earlier[name], arrays[name]]) for name in columns}
+
+    return pd.DataFrame(arrays, copy=False), skip
+
+
+@timed("load")
+def count_price_bars(symbols: list, start=None, end=None) -> int:
+    """Total number of stored bars of several symbols, optionally between two dates, with one query."""
+    table = PriceHistory.__table__
+    query = select(func.count()).where(table.c.symbol.in_(symbols))
+    if start is not None:
+        query = query.where(table.c.date >= start)
+    if end is not None:
+        query = query.where(table.c.date <= end)
+    return db.session.connection().execute(query).scalar_one()
+
+
+@timed("load")
+def load_close_panel(symbols: list) -> pd.DataFrame:
+    """
+    Fetch the closing prices of several symbols with a single query and align
+    them into a date x symbol panel.
+
+    Returns:
+        DataFrame indexed by date with one float column per symbol found. Dates a
+        symbol has no bar for are NaN.
+    """
+    table = PriceHistory.__table__
+    rows = db.session.connection().execute(
+        select(table.c.date, table.c.symbol, table.c.close)
+        .where(table.c.symbol.in_(symbols))
+        .order_by(table.c.date.asc())
+    ).all()
+    if not rows:
+        return pd.DataFrame()
+    add_rows(len(rows))
 
-    return pd.DataFrame(data)
+    dates, row_symbols, closes = zip(*rows)
+    long = pd.DataFrame({
+        'date': _to_array('date', dates),
+        'symbol': row_symbols,
+        'close': _to_array('close', closes),
+    }, copy=False)
+    return long.pivot(index='date', columns='symbol', values='close')
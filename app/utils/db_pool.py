@@ -0,0 +1,109 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds, in seconds, of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.01, 0.1, 1.0, float("inf"))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection
+    and how often it gave up after ``pool_timeout``.
+
+    Counters are per pool, so per process: each gunicorn or Celery worker
+    reports its own. Together with the pool's size and overflow they show
+    whether ``pool_size``/``max_overflow`` fit the worker's concurrency.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+
+        waited = time.perf_counter() - started
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self.wait_buckets[next(i for i, bound in enumerate(WAIT_BUCKETS) if waited <= bound)] += 1
+        return connection
+
+    def stats(self) -> dict:
+        capacity = self.size() + self._max_overflow
+        checked_out = self.checkedout()
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "max_overflow": self._max_overflow,
+                "checked_out": checked_out,
+                "idle": self.checkedin(),
+                "overflow": max(0, self.overflow()),
+                "utilization": checked_out / capacity if capacity > 0 else None,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds,
+                "wait_seconds_max": self.max_wait_seconds,
+                "wait_seconds_mean": self.wait_seconds / self.checkouts if self.checkouts else 0.0,
+                "wait_histogram": {
+                    ("+Inf" if bound == float("inf") else f"{bound:g}"): count
+                    for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)
+                },
+            }
+
+
+def engine_options(database_uri: str, role_options: dict, pre_ping: bool = True) -> dict:
+    """
+    ``SQLALCHEMY_ENGINE_OPTIONS`` for one process role.
+
+    Pool sizing, recycling and the statement timeout only apply to Postgres;
+    other databases (SQLite in tests and benchmarks) keep SQLAlchemy's
+    defaults, as a QueuePool would give every ``:memory:`` connection its own
+    empty database.
+
+    Args:
+        database_uri (str): SQLALCHEMY_DATABASE_URI
+        role_options (dict): pool_size, max_overflow, pool_timeout, pool_recycle and
+                             statement_timeout_ms of the role
+        pre_ping (bool): Test connections for liveness on checkout
+
+    Returns:
+        dict: Keyword arguments for ``create_engine``
+    """
+    if not database_uri or not database_uri.startswith("postgresql"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": role_options["pool_size"],
+        "max_overflow": role_options["max_overflow"],
+        "pool_timeout": role_options["pool_timeout"],
+        "pool_recycle": role_options["pool_recycle"],
+        "pool_pre_ping": pre_ping,
+    }
+    if role_options.get("statement_timeout_ms"):
+        options["connect_args"] = {"options": f"-c statement_timeout={role_options['statement_timeout_ms']}"}
+    return options
+
+
+def pool_stats(engine) -> dict:
+    """Checkout statistics of an engine's pool, or just its status for uninstrumented pools."""
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"pool": type(pool).__name__, "status": pool.status()}
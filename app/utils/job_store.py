@@ -0,0 +1,149 @@
+import time
+import uuid
+from datetime import datetime, timezone
+
+import redis
+
+# Compare-and-delete, so a finished job never releases a newer job's claim on its symbol
+_RELEASE_CLAIM_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Claim the symbol and write the queued job in one step, so that a request seeing the
+# claim always finds the job's hash; otherwise returns the id holding the claim
+_CLAIM_SCRIPT = """
+if redis.call('set', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    redis.call('hset', KEYS[2], unpack(ARGV, 4))
+    redis.call('expire', KEYS[2], ARGV[3])
+    return {1, ARGV[1]}
+end
+return {0, redis.call('get', KEYS[1])}
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class FetchJobStore:
+    """
+    Redis records of asynchronous ``/stock/fetch`` jobs, shared by the web
+    workers that enqueue them and the Celery workers that run them.
+
+    A job is a hash ``fetch-job:<id>`` with its state (queued, running, done
+    or failed), the symbol, timestamps and the stored row counts. While a job
+    is queued or running, ``fetch-job:symbol:<SYMBOL>`` holds its id, so
+    requests for the same symbol join that job instead of enqueuing another.
+    A queued or running job whose claim has expired or passed to another job
+    (its worker died, or its message was lost) is reported as failed.
+    ``fetch-job:last-refresh`` holds when the nightly refresh last stored data.
+
+    Ids of background indicator jobs are recorded as ``indicator-job:<id>``
+    for as long as Celery keeps their results, so that unknown ids can be told
+    apart from queued jobs (Celery reports both as PENDING).
+    """
+
+    key_prefix = "fetch-job"
+
+    def __init__(self):
+        self.client = None
+        self.ttl = 24 * 60 * 60
+        self.claim_timeout = 60 * 60
+        self.indicator_job_ttl = 24 * 60 * 60
+
+    def init_app(self, app):
+        self.ttl = app.config.get("FETCH_JOB_TTL", self.ttl)
+        self.indicator_job_ttl = app.config.get("CELERY_TASK_RESULT_EXPIRES", self.indicator_job_ttl)
+        self.claim_timeout = app.config.get("FETCH_JOB_CLAIM_TIMEOUT", self.claim_timeout)
+        self.client = redis.Redis.from_url(
+            app.config["FETCH_JOB_URL"],
+            socket_timeout=app.config.get("FETCH_JOB_SOCKET_TIMEOUT", 2),
+            socket_connect_timeout=app.config.get("FETCH_JOB_SOCKET_TIMEOUT", 2),
+            decode_responses=True,
+        )
+
+    def claim(self, symbol: str) -> tuple:
+        """
+        Create a queued job for ``symbol``, unless one is already queued or running.
+
+        Returns:
+            tuple: (job dict, True if the job was created by this call)
+        """
+        claim_key = self._claim_key(symbol)
+        for _ in range(3):
+            job_id = uuid.uuid4().hex
+            job = {"id": job_id, "symbol": symbol, "state": QUEUED, "created_at": _now()}
+            fields = [value for item in job.items() for value in item]
+            created, *existing = self.client.eval(
+                _CLAIM_SCRIPT, 2, claim_key, f"{self.key_prefix}:{job_id}",
+                job_id, self.claim_timeout, self.ttl, *fields,
+            )
+            if created:
+                return job, True
+
+            # The claim expired or was released since the SET; try again
+            job = self.get(existing[0]) if existing and existing[0] else None
+            if job is not None:
+                return job, False
+        raise redis.RedisError(f"Could not claim a fetch job for {symbol}")
+
+    def get(self, job_id: str):
+        job = self.client.hgetall(f"{self.key_prefix}:{job_id}")
+        if not job:
+            return None
+        if job["state"] in (QUEUED, RUNNING) and self.client.get(self._claim_key(job["symbol"])) != job_id:
+            # finish() and fail() save the job before releasing the claim, so read it again
+            # to tell a job that just ended from one that was lost
+            job = self.client.hgetall(f"{self.key_prefix}:{job_id}") or job
+            if job["state"] in (QUEUED, RUNNING):
+                job.update(state=FAILED, error="Worker lost")
+        for field in ("inserted", "updated"):
+            if field in job:
+                job[field] = int(job[field])
+        return job
+
+    def mark_running(self, job_id: str) -> None:
+        self._save(job_id, {"state": RUNNING, "started_at": _now()})
+
+    def finish(self, job_id: str, symbol: str, inserted: int, updated: int, result: str) -> None:
+        """Record a completed fetch, ``result`` being the fetcher's ok/empty status."""
+        self._save(job_id, {"state": DONE, "finished_at": _now(), "inserted": inserted, "updated": updated,
+                            "result": result})
+        self._release(symbol, job_id)
+
+    def fail(self, job_id: str, symbol: str, error: str) -> None:
+        self._save(job_id, {"state": FAILED, "finished_at": _now(), "error": error})
+        self._release(symbol, job_id)
+
+    def record_indicator_job(self, job_id: str) -> None:
+        self.client.set(f"indicator-job:{job_id}", 1, ex=self.indicator_job_ttl)
+
+    def indicator_job_exists(self, job_id: str) -> bool:
+        return bool(self.client.exists(f"indicator-job:{job_id}"))
+
+    def mark_refreshed(self) -> None:
+        """Record that the nightly refresh completed with at least one symbol fetched."""
+        self.client.set(f"{self.key_prefix}:last-refresh", time.time())
+
+    def last_refreshed(self):
+        """Unix time of the last successful nightly refresh, or None if none was recorded."""
+        value = self.client.get(f"{self.key_prefix}:last-refresh")
+        return float(value) if value is not None else None
+
+    def _save(self, job_id: str, fields: dict) -> None:
+        key = f"{self.key_prefix}:{job_id}"
+        pipe = self.client.pipeline()
+        pipe.hset(key, mapping=fields)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def _claim_key(self, symbol: str) -> str:
+        return f"{self.key_prefix}:symbol:{symbol}"
+
+    def _release(self, symbol: str, job_id: str) -> None:
+        self.client.eval(_RELEASE_CLAIM_SCRIPT, 1, self._claim_key(symbol), job_id)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
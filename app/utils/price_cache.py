@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class PriceFrameCache:
+    """
+    Bounded, per-process LRU cache of per-symbol price DataFrames.
+
+    Entries are keyed by symbol and stored together with the data version they
+    were loaded at (see ``get_data_version``). A lookup with a different version
+    is a miss and drops the stale frame, so rows written by any process are
+    picked up on the next read. Writers in this process can also call
+    ``invalidate`` to release the memory straight away.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.enabled = True
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # symbol -> (version, frame, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get("PRICE_CACHE_ENABLED", True)
+        self.max_entries = app.config.get("PRICE_CACHE_MAX_ENTRIES", self.max_entries)
+        self.max_bytes = app.config.get("PRICE_CACHE_MAX_BYTES", self.max_bytes)
+        self.clear()
+
+    def get(self, symbol: str, version):
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(symbol)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry[0] != version:
+                self._remove(symbol)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(symbol)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, symbol: str, version, frame: pd.DataFrame) -> None:
+        if not self.enabled:
+            return
+
+        nbytes = int(frame.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if symbol in self._entries:
+                self._remove(symbol)
+
+            self._entries[symbol] = (version, frame, nbytes)
+            self._bytes += nbytes
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, symbol: str = None) -> None:
+        """Drop the cached frame for ``symbol``, or every frame if no symbol is given."""
+        with self._lock:
+            if symbol is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+            elif symbol in self._entries:
+                self._remove(symbol)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, symbol: str) -> None:
+        _, _, nbytes = self._entries.pop(symbol)
+        self._bytes -= nbytes
@@ -0,0 +1,149 @@
+import json
+import logging
+import threading
+import time
+
+import redis
+from flask_login import UserMixin
+
+logger = logging.getLogger(__name__)
+
+
+class Principal(UserMixin):
+    """
+    Snapshot of the fields an authenticated request needs from a ``User``,
+    safe to keep across requests (unlike a session-bound model instance).
+    """
+
+    def __init__(self, id: int, email: str, name: str = None):
+        self.id = id
+        self.email = email
+        self.name = name
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(id=user.id, email=user.email, name=user.name)
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "email": self.email, "name": self.name}
+
+    def get_id(self):
+        return self.id
+
+    def __repr__(self) -> str:
+        return f"<Principal {self.email}>"
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of authenticated principals, so ``@login_required``
+    does not load the user from the database on every request.
+
+    Principals live in a per-process dict for ``ttl`` seconds and, when a
+    Redis URL is configured, in Redis as well, so a worker that misses
+    locally can still skip the database. ``invalidate`` drops a user from
+    this process and from Redis; other processes may keep serving their local
+    copy for at most ``ttl`` seconds. Any Redis failure falls back to the
+    database for a while.
+    """
+
+    key_prefix = "principal"
+
+    def __init__(self):
+        self.enabled = False
+        self.ttl = 60
+        self.client = None
+        self.retry_after = 30
+        self._disabled_until = 0
+        self._entries = {}  # user id -> (expires at, principal)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get("PRINCIPAL_CACHE_ENABLED", False)
+        self.ttl = app.config.get("PRINCIPAL_CACHE_TTL", self.ttl)
+        self._disabled_until = 0
+        self.client = None
+        url = app.config.get("PRINCIPAL_CACHE_URL")
+        if self.enabled and url:
+            self.client = redis.Redis.from_url(
+                url,
+                socket_timeout=app.config.get("PRINCIPAL_CACHE_SOCKET_TIMEOUT", 0.2),
+                socket_connect_timeout=app.config.get("PRINCIPAL_CACHE_SOCKET_TIMEOUT", 0.2),
+            )
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, user_id, load):
+        """
+        Return the principal of ``user_id``, calling ``load(user_id)`` (which
+        returns a Principal or None) on a miss. Unknown users are not cached.
+        """
+        if not self.enabled:
+            return load(user_id)
+
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        principal = self._get_shared(user_id)
+        if principal is None:
+            principal = load(user_id)
+            if principal is None:
+                return None
+            self._put_shared(principal)
+
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, principal)
+        return principal
+
+    def invalidate(self, user_id) -> None:
+        user_id = int(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if self._shared_available():
+            try:
+                self.client.delete(f"{self.key_prefix}:{user_id}")
+            except redis.RedisError as e:
+                self._back_off(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "shared": self.client is not None,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _get_shared(self, user_id: int):
+        if not self._shared_available():
+            return None
+        try:
+            cached = self.client.get(f"{self.key_prefix}:{user_id}")
+        except redis.RedisError as e:
+            self._back_off(e)
+            return None
+        return Principal(**json.loads(cached)) if cached is not None else None
+
+    def _put_shared(self, principal: Principal) -> None:
+        if not self._shared_available():
+            return
+        try:
+            self.client.set(f"{self.key_prefix}:{principal.id}", json.dumps(principal.to_dict()), ex=self.ttl)
+        except redis.RedisError as e:
+            self._back_off(e)
+
+    def _shared_available(self) -> bool:
+        return self.client is not None and time.monotonic() >= self._disabled_until
+
+    def _back_off(self, error: Exception) -> None:
+        logger.warning("Principal cache unavailable, using local entries for %ss: %s", self.retry_after, error)
+        self._disabled_until = time.monotonic() + self.retry_after
@@ -0,0 +1,170 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+from celery import current_task
+from celery.signals import task_postrun, task_prerun
+from flask import has_request_context, request
+from prometheus_client import Counter as PrometheusCounter
+from sqlalchemy import event
+
+from app.utils.request_metrics import add_query
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERIES = PrometheusCounter("db_slow_queries", "SQL statements slower than SQL_SLOW_QUERY_MS", ["caller"])
+
+_EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_STATEMENT_LOG_LENGTH = 2000
+
+
+def _caller() -> str:
+    """Endpoint or Celery task the current statement runs for."""
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    if current_task and current_task.request.id:
+        return current_task.name
+    return "-"
+
+
+def parameters_shape(parameters, executemany: bool = False) -> str:
+    """
+    Describe bound parameters by count and type only, e.g.
+    ``3 params (str x 1, date x 2)`` or ``500 rows x 7 params (float x 4, ...)``,
+    so that logs show how a statement was called without its values.
+    """
+    if executemany:
+        rows = list(parameters)
+        if not rows:
+            return "0 rows"
+        return f"{len(rows)} rows x {parameters_shape(rows[0])}"
+    if not parameters:
+        return "no params"
+    values = parameters.values() if isinstance(parameters, dict) else parameters
+    types = Counter(type(value).__name__ for value in values)
+    return f"{sum(types.values())} params ({', '.join(f'{name} x {count}' for name, count in types.most_common())})"
+
+
+class QueryMetrics:
+    """
+    Opt-in SQL instrumentation through SQLAlchemy engine events, enabled by
+    ``SQL_INSTRUMENTATION_ENABLED``.
+
+    Every statement is counted towards its request (the ``db`` Server-Timing
+    entry and ``http_request_queries`` histogram of ``app.utils.request_metrics``)
+    or Celery task (logged when the task ends), so that N+1 query patterns
+    show up as high counts. Statements slower than ``SQL_SLOW_QUERY_MS`` are
+    logged with their caller, row count and parameter shape. On Postgres a
+    sample of the slow SELECTs (``SQL_EXPLAIN_SAMPLE_RATE``, at most one every
+    ``SQL_EXPLAIN_MIN_INTERVAL`` seconds per process) is run again under
+    ``EXPLAIN (ANALYZE, BUFFERS)`` inside a savepoint and the plan logged.
+    EXPLAIN ANALYZE executes the query a second time, on the caller's time.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_seconds = 0.25
+        self.explain_sample_rate = 0.0
+        self.explain_min_interval = 60
+        self._last_explain = 0.0
+        self._task_queries = {}  # task id -> [statements, seconds]
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.enabled = app.config.get("SQL_INSTRUMENTATION_ENABLED", False)
+        if not self.enabled:
+            return
+        self.slow_seconds = app.config.get("SQL_SLOW_QUERY_MS", 250) / 1000
+        self.explain_sample_rate = app.config.get("SQL_EXPLAIN_SAMPLE_RATE", 0.0)
+        self.explain_min_interval = app.config.get("SQL_EXPLAIN_MIN_INTERVAL", 60)
+
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+                event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+                event.listen(engine, "handle_error", self._handle_error)
+
+        task_prerun.connect(self._task_started, weak=False, dispatch_uid="query_metrics.task_started")
+        task_postrun.connect(self._task_finished, weak=False, dispatch_uid="query_metrics.task_finished")
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+
+        add_query(elapsed)
+        if current_task and current_task.request.id in self._task_queries:
+            with self._lock:
+                counts = self._task_queries[current_task.request.id]
+                counts[0] += 1
+                counts[1] += elapsed
+
+        if elapsed >= self.slow_seconds:
+            self._report_slow(conn, cursor, statement, parameters, executemany, elapsed)
+
+    def _report_slow(self, conn, cursor, statement, parameters, executemany, elapsed):
+        caller = _caller()
+        SLOW_QUERIES.labels(caller).inc()
+        rows = cursor.rowcount if cursor.rowcount >= 0 else "?"
+        logger.warning("Slow query: %.1f ms for %s, rows=%s, %s: %s", elapsed * 1e3, caller, rows,
+                       parameters_shape(parameters, executemany),
+                       _WHITESPACE.sub(" ", statement).strip()[:_STATEMENT_LOG_LENGTH])
+
+        if executemany or conn.dialect.name != "postgresql" or not _EXPLAINABLE.match(statement):
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_explain < self.explain_min_interval or random.random() >= self.explain_sample_rate:
+                return
+            self._last_explain = now
+
+        try:
+            plan = self._explain(cursor.connection, statement, parameters)
+        except Exception as e:
+            logger.warning("Could not explain slow query for %s: %s", caller, e)
+            return
+        logger.warning("Plan of slow query for %s:\n%s", caller, plan)
+
+    @staticmethod
+    def _explain(dbapi_connection, statement, parameters) -> str:
+        # A raw DB-API cursor, so the EXPLAIN neither fires these events again nor,
+        # if it fails, aborts the caller's transaction (it runs in a savepoint)
+        in_transaction = not getattr(dbapi_connection, "autocommit", False)
+        explain = dbapi_connection.cursor()
+        try:
+            if in_transaction:
+                explain.execute("SAVEPOINT slow_query_explain")
+            try:
+                explain.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+                plan = "\n".join(row[0] for row in explain.fetchall())
+            except Exception:
+                if in_transaction:
+                    explain.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                raise
+            if in_transaction:
+                explain.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        finally:
+            explain.close()
+
+    def _task_started(self, task_id=None, task=None, **kwargs):
+        with self._lock:
+            self._task_queries[task_id] = [0, 0.0]
+
+    def _task_finished(self, task_id=None, task=None, **kwargs):
+        with self._lock:
+            counts = self._task_queries.pop(task_id, None)
+        if counts and counts[0]:
+            logger.info("Task %s ran %d queries in %.1f ms", task.name, counts[0], counts[1] * 1e3)
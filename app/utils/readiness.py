@@ -0,0 +1,188 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+
+import redis
+from flask import current_app
+from sqlalchemy import text
+
+from app.utils.db_pool import pool_stats
+
+CHECKS = ("database", "pool", "redis", "celery_queue", "refresh")
+
+
+class ReadinessProbe:
+    """
+    Whether this worker should receive traffic, for ``/ready``. Liveness
+    stays with the static ``/health-check``.
+
+    The pool check only reads this process's pool counters; the database,
+    Redis, Celery queue and last-refresh checks do I/O and run concurrently
+    on a small thread pool, each reported as failed if it has not answered
+    within ``READINESS_TIMEOUT`` seconds. A check still running from an
+    earlier call is not started again, so a hung dependency cannot pile up
+    threads. Results are reused for ``READINESS_CACHE_TTL`` seconds, which
+    keeps frequent load balancer polls from adding load to the dependencies.
+
+    The worker is ready when every check in ``READINESS_CRITICAL_CHECKS``
+    passes; the others are reported only. Redis and the Celery queue are the
+    same for every worker, so listing ``redis`` or ``celery_queue`` there fails
+    all of them together when Redis is down or the queue backs up.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.timeout = 1.0
+        self.cache_ttl = 5.0
+        self.critical = ("database", "pool")
+        self.max_db_latency = 0.25
+        self.max_pool_utilization = 1.0
+        self.celery_queues = ("celery",)
+        self.max_queue_depth = 1000
+        self.max_refresh_age = 48 * 60 * 60
+        self._servers = []  # [(names, client)], one per distinct Redis URL
+        self._broker = None
+        self._executor = None
+        self._pending = {}  # check name -> future of its last run
+        self._result = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.db = db
+        self.timeout = app.config.get("READINESS_TIMEOUT", self.timeout)
+        self.cache_ttl = app.config.get("READINESS_CACHE_TTL", self.cache_ttl)
+        self.critical = tuple(app.config.get("READINESS_CRITICAL_CHECKS", self.critical))
+        self.max_db_latency = app.config.get("READINESS_DB_MAX_LATENCY_MS", 250) / 1000
+        self.max_pool_utilization = app.config.get("READINESS_POOL_MAX_UTILIZATION", self.max_pool_utilization)
+        self.celery_queues = tuple(app.config.get("READINESS_CELERY_QUEUES", self.celery_queues))
+        self.max_queue_depth = app.config.get("READINESS_MAX_QUEUE_DEPTH", self.max_queue_depth)
+        self.max_refresh_age = app.config.get("READINESS_MAX_REFRESH_AGE", self.max_refresh_age)
+
+        urls = {"broker": app.config.get("CELERY_BROKER_URL"), "fetch_jobs": app.config.get("FETCH_JOB_URL")}
+        if app.config.get("INDICATOR_CACHE_ENABLED"):
+            urls["indicator_cache"] = app.config.get("INDICATOR_CACHE_URL")
+        if app.config.get("PRINCIPAL_CACHE_ENABLED"):
+            urls["principal_cache"] = app.config.get("PRINCIPAL_CACHE_URL")
+
+        by_url = {}
+        for name, url in urls.items():
+            if url and url.startswith(("redis://", "rediss://", "unix://")):
+                by_url.setdefault(url, []).append(name)
+        self._servers = [
+            (names, redis.Redis.from_url(url, socket_timeout=self.timeout, socket_connect_timeout=self.timeout))
+            for url, names in by_url.items()
+        ]
+        self._broker = next((client for names, client in self._servers if "broker" in names), None)
+        with self._lock:
+            self._result = None
+            self._pending.clear()
+
+    def check(self) -> dict:
+        """
+        Readiness of this worker, from the cache while fresh.
+
+        Returns:
+            dict: {'ready': bool, 'checks': {name: {'ok': bool, ...}}, 'elapsed_ms': float,
+                   'age_seconds': seconds since the checks ran}
+        """
+        with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.cache_ttl:
+                self._result = self._run(current_app._get_current_object())
+                self._checked_at = time.monotonic()
+            return {**self._result, "age_seconds": round(time.monotonic() - self._checked_at, 3)}
+
+    def _run(self, app) -> dict:
+        started = time.perf_counter()
+        checks = {"pool": self._check_pool()}
+
+        if self._executor is None:
+            # Created on first use, so that each forked worker has its own threads
+            self._executor = ThreadPoolExecutor(max_workers=len(CHECKS) - 1, thread_name_prefix="readiness")
+        probes = {
+            "database": self._check_database,
+            "redis": self._check_redis,
+            "celery_queue": self._check_celery_queue,
+            "refresh": self._check_refresh,
+        }
+        for name, probe in probes.items():
+            pending = self._pending.get(name)
+            if pending is None or pending.done():
+                self._pending[name] = self._executor.submit(self._in_app_context, app, probe)
+
+        wait([self._pending[name] for name in probes], timeout=self.timeout)
+        for name in probes:
+            future = self._pending[name]
+            if not future.done():
+                checks[name] = {"ok": False, "error": f"No answer within {self.timeout}s"}
+            elif future.exception() is not None:
+                checks[name] = {"ok": False, "error": str(future.exception())}
+            else:
+                checks[name] = future.result()
+
+        return {
+            "ready": all(checks[name]["ok"] for name in self.critical if name in checks),
+            "checks": {name: checks[name] for name in CHECKS},
+            "elapsed_ms": round((time.perf_counter() - started) * 1e3, 3),
+        }
+
+    @staticmethod
+    def _in_app_context(app, probe):
+        with app.app_context():
+            return probe()
+
+    def _check_pool(self) -> dict:
+        stats = pool_stats(self.db.engine)
+        utilization = stats.get("utilization")
+        if utilization is None:
+            return {"ok": True, **stats}
+        return {
+            "ok": utilization < self.max_pool_utilization,
+            "utilization": utilization,
+            "checked_out": stats["checked_out"],
+            "overflow": stats["overflow"],
+            "timeouts": stats["timeouts"],
+        }
+
+    def _check_database(self) -> dict:
+        started = time.perf_counter()
+        with self.db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        latency = time.perf_counter() - started
+        return {"ok": latency <= self.max_db_latency, "latency_ms": round(latency * 1e3, 3)}
+
+    def _check_redis(self) -> dict:
+        servers = {}
+        for names, client in self._servers:
+            started = time.perf_counter()
+            try:
+                client.ping()
+            except redis.RedisError as e:
+                servers[",".join(names)] = {"ok": False, "error": str(e)}
+                continue
+            servers[",".join(names)] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1e3, 3)}
+        return {"ok": all(server["ok"] for server in servers.values()), "servers": servers}
+
+    def _check_celery_queue(self) -> dict:
+        if self._broker is None:
+            return {"ok": True, "skipped": "Broker is not Redis"}
+        pipe = self._broker.pipeline()
+        for queue in self.celery_queues:
+            pipe.llen(queue)
+        depths = dict(zip(self.celery_queues, pipe.execute()))
+        depth = sum(depths.values())
+        return {"ok": depth <= self.max_queue_depth, "depth": depth, "queues": depths}
+
+    def _check_refresh(self) -> dict:
+        from app.extensions import fetch_jobs
+
+        last = fetch_jobs.last_refreshed()
+        if last is None:
+            return {"ok": False, "error": "No refresh recorded"}
+        age = time.time() - last
+        return {
+            "ok": age <= self.max_refresh_age,
+            "age_seconds": round(age),
+            "last_refresh": datetime.fromtimestamp(last, timezone.utc).isoformat(),
+        }
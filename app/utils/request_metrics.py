@@ -0,0 +1,185 @@
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import Response, g, has_request_context, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram, generate_latest, multiprocess
+
+PHASES = ("auth", "load", "compute", "serialize")
+
+# Prometheus keeps these per process; under gunicorn, PROMETHEUS_MULTIPROC_DIR (set in
+# gunicorn_config.py before the workers start) makes every worker write them to files
+# that /metrics aggregates
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency", ["endpoint", "method", "status"],
+)
+PHASE_SECONDS = Histogram(
+    "http_request_phase_seconds", "Time a request spent in each phase", ["endpoint", "phase"],
+)
+RESPONSE_BYTES = Histogram(
+    "http_response_bytes", "Response body size", ["endpoint"],
+    buckets=(1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, float("inf")),
+)
+RESPONSE_ROWS = Histogram(
+    "http_request_rows", "Price rows a request read, from the database or the price cache", ["endpoint"],
+    buckets=(10, 100, 1000, 10000, 100000, 1000000, float("inf")),
+)
+# Only recorded with SQL_INSTRUMENTATION_ENABLED (see app.utils.query_metrics)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries", "SQL statements a request executed", ["endpoint"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, float("inf")),
+)
+
+
+class _RequestTiming:
+    """
+    Phase durations of one request. Phases nest, and time is only charged to
+    the innermost active one, so a load inside a compute counts as load and the
+    phases never add up to more than the whole request.
+    """
+
+    __slots__ = ("started", "phases", "rows", "queries", "query_seconds", "_active", "_since")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.rows = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._active = []
+        self._since = self.started
+
+    def enter(self, name: str) -> None:
+        now = time.perf_counter()
+        if self._active:
+            self._charge(now)
+        self._active.append(name)
+        self._since = now
+
+    def exit(self) -> None:
+        now = time.perf_counter()
+        self._charge(now)
+        self._active.pop()
+        self._since = now
+
+    def _charge(self, now: float) -> None:
+        name = self._active[-1]
+        self.phases[name] = self.phases.get(name, 0.0) + now - self._since
+
+
+def _current():
+    return g.get("_request_timing") if has_request_context() else None
+
+
+@contextmanager
+def phase(name: str):
+    """Charge the enclosed time to ``name`` in the current request; a no-op outside requests (e.g. in Celery)."""
+    timing = _current()
+    if timing is None:
+        yield
+        return
+    timing.enter(name)
+    try:
+        yield
+    finally:
+        timing.exit()
+
+
+def timed(name: str):
+    """Decorator form of ``phase``."""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with phase(name):
+                return f(*args, **kwargs)
+        return decorated
+    return decorator
+
+
+def add_rows(count: int) -> None:
+    """Count price rows read by the current request."""
+    timing = _current()
+    if timing is not None:
+        timing.rows += count
+
+
+def add_query(seconds: float) -> None:
+    """Count an SQL statement executed by the current request."""
+    timing = _current()
+    if timing is not None:
+        timing.queries += 1
+        timing.query_seconds += seconds
+
+
+def metrics_response() -> Response:
+    """Prometheus exposition of the request histograms, over all gunicorn workers in multi-process mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+class RequestMetrics:
+    """
+    Times every request and the phases it goes through (see ``PHASES``),
+    records them in the Prometheus histograms above and, unless
+    ``SERVER_TIMING_ENABLED`` is off, reports them to the client in a
+    ``Server-Timing`` header, e.g.
+    ``auth;dur=0.41, load;dur=12.02;desc="1260 rows", compute;dur=30.17, serialize;dur=8.33;desc="51234 bytes", total;dur=52.90``.
+
+    Endpoints are labelled by Flask endpoint name, so label cardinality stays
+    bounded whatever the URLs. Bodies streamed without a Content-Length have
+    no size, and generators run after the response is timed. With SQL
+    instrumentation on, a ``db`` entry gives the statements executed and
+    their time, which overlaps the phases rather than adding to them.
+    """
+
+    def __init__(self):
+        self.server_timing = True
+
+    def init_app(self, app):
+        self.server_timing = app.config.get("SERVER_TIMING_ENABLED", True)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    @staticmethod
+    def _start():
+        g._request_timing = _RequestTiming()
+
+    def _finish(self, response):
+        timing = g.pop("_request_timing", None)
+        if timing is None:
+            return response
+        total = time.perf_counter() - timing.started
+        size = response.content_length
+
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_SECONDS.labels(endpoint, request.method, str(response.status_code)).observe(total)
+        for name, seconds in timing.phases.items():
+            PHASE_SECONDS.labels(endpoint, name).observe(seconds)
+        if timing.rows:
+            RESPONSE_ROWS.labels(endpoint).observe(timing.rows)
+        if timing.queries:
+            REQUEST_QUERIES.labels(endpoint).observe(timing.queries)
+        if size is not None:
+            RESPONSE_BYTES.labels(endpoint).observe(size)
+
+        if self.server_timing:
+            entries = []
+            for name in PHASES:
+                if name not in timing.phases:
+                    continue
+                entry = f"{name};dur={timing.phases[name] * 1e3:.2f}"
+                if name == "load" and timing.rows:
+                    entry += f';desc="{timing.rows} rows"'
+                elif name == "serialize" and size is not None:
+                    entry += f';desc="{size} bytes"'
+                entries.append(entry)
+            if timing.queries:
+                entries.append(f'db;dur={timing.query_seconds * 1e3:.2f};desc="{timing.queries} queries"')
+            entries.append(f"total;dur={total * 1e3:.2f}")
+            response.headers["Server-Timing"] = ", ".join(entries)
+        return response
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Compare-and-delete, so a worker never releases a lock that expired and was taken by another worker
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class IndicatorResultCache:
+    """
+    Redis-backed cache of computed indicator payloads shared by all workers.
+
+    Keys combine the symbol, its data version and a digest of the normalized
+    indicator parameters, so a refresh that stores new bars naturally moves
+    readers to a new key. Concurrent misses for the same key are coalesced
+    with a short-lived Redis lock: one worker computes and stores the result
+    before releasing the lock, the others wait for it, or compute themselves
+    as soon as the lock is gone without a result (the holder failed or
+    produced an error payload). Any Redis failure degrades to computing the
+    result directly.
+    """
+
+    key_prefix = "indicators"
+
+    def __init__(self):
+        self.enabled = False
+        self.client = None
+        self.ttl = 6 * 60 * 60
+        self.lock_timeout = 30
+        self.wait_timeout = 10
+        self.poll_interval = 0.05
+        self.retry_after = 30
+        self._disabled_until = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get("INDICATOR_CACHE_ENABLED", False)
+        self.ttl = app.config.get("INDICATOR_CACHE_TTL", self.ttl)
+        self.lock_timeout = app.config.get("INDICATOR_CACHE_LOCK_TIMEOUT", self.lock_timeout)
+        self.wait_timeout = app.config.get("INDICATOR_CACHE_WAIT_TIMEOUT", self.wait_timeout)
+        self._disabled_until = 0
+        if self.enabled:
+            self.client = redis.Redis.from_url(
+                app.config["INDICATOR_CACHE_URL"],
+                socket_timeout=app.config.get("INDICATOR_CACHE_SOCKET_TIMEOUT", 0.5),
+                socket_connect_timeout=app.config.get("INDICATOR_CACHE_SOCKET_TIMEOUT", 0.5),
+            )
+
+    @staticmethod
+    def normalize_params(indicators: dict) -> dict:
+        """Canonical form of an indicator request, so equivalent requests share a key."""
+        return {
+            "rsi": bool(indicators.get("rsi")),
+            "macd": bool(indicators.get("macd")),
+            "sma": sorted(set(indicators.get("sma") or [])),
+            "ema": sorted(set(indicators.get("ema") or [])),
+        }
+
+    def make_key(self, symbol: str, indicators: dict, version, **scope) -> str:
+        params = self.normalize_params(indicators)
+        params.update((name, value) for name, value in scope.items() if value is not None)
+        params = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha1(f"{version}|{params}".encode()).hexdigest()
+        return f"{self.key_prefix}:{symbol}:{digest}"
+
+    def get_or_compute(self, symbol: str, indicators: dict, version, compute, **scope) -> dict:
+        """
+        Return the cached payload for (symbol, indicators, version), computing it
+        with ``compute()`` on a miss. Keyword arguments that are not None (e.g. a
+        date range or an output format) become part of the key. Payloads
+        containing an ``error`` key are not cached.
+        """
+        if not self._available():
+            return compute()
+
+        key = self.make_key(symbol, indicators, version, **scope)
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        try:
+            cached = self.client.get(key)
+            if cached is not None:
+                return json.loads(cached)
+            acquired = self.client.set(lock_key, token, nx=True, ex=self.lock_timeout)
+        except redis.RedisError as e:
+            self._back_off(e)
+            return compute()
+
+        if acquired:
+            # Store before releasing, so no request finds neither the result nor the lock
+            try:
+                result = compute()
+                if "error" not in result:
+                    self._store(symbol, key, result)
+            finally:
+                self._release(lock_key, token)
+            return result
+
+        try:
+            cached = self._wait_for(key, lock_key)
+        except redis.RedisError as e:
+            self._back_off(e)
+            cached = None
+        if cached is not None:
+            return json.loads(cached)
+
+        return compute()
+
+    def invalidate(self, symbol: str) -> None:
+        """Drop every cached payload of ``symbol``."""
+        if not self._available():
+            return
+
+        index_key = f"{self.key_prefix}:{symbol}:keys"
+        try:
+            keys = self.client.smembers(index_key)
+            self.client.delete(index_key, *keys)
+        except redis.RedisError as e:
+            self._back_off(e)
+
+    def _store(self, symbol: str, key: str, result: dict) -> None:
+        index_key = f"{self.key_prefix}:{symbol}:keys"
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(key, json.dumps(result, separators=(",", ":")), ex=self.ttl)
+            pipe.sadd(index_key, key)
+            pipe.expire(index_key, self.ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            self._back_off(e)
+
+    def _release(self, lock_key: str, token: str) -> None:
+        try:
+            self.client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except redis.RedisError as e:
+            self._back_off(e)
+
+    def _wait_for(self, key: str, lock_key: str):
+        """The payload stored under ``key`` by the lock holder, or None once the lock is gone without one."""
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.poll_interval)
+            pipe = self.client.pipeline()
+            pipe.get(key)
+            pipe.exists(lock_key)
+            cached, locked = pipe.execute()
+            if cached is not None or not locked:
+                return cached
+        return None
+
+    def _available(self) -> bool:
+        return self.enabled and self.client is not None and time.monotonic() >= self._disabled_until
+
+    def _back_off(self, error: Exception) -> None:
+        logger.warning("Indicator cache unavailable, computing directly for %ss: %s", self.retry_after, error)
+        self._disabled_until = time.monotonic() + self.retry_after
@@ -1,15 +1,24 @@
 from flask import Blueprint
-from .health import health_check
-from .stock import get_stock_history, get_indicators, fetch_stock_data
+from .health import health_check, readiness_check, cache_stats, database_pool_stats, metrics
+from .stock import get_stock_history, get_indicators, get_batch_indicators, fetch_stock_data, get_fetch_job, \
+    get_indicator_job
 from .user import register, login, logout, user_info
 from .. import login_manager
-from ..models import User
+from ..utils.auth import load_principal, principal_from_request
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Load user by ID."""
+    """Load user by ID, through the principal cache."""
     if user_id and user_id != "None":
-        return User.get_by_id(record_id=user_id)
+        return load_principal(user_id)
+
+
+@login_manager.request_loader
+def load_user_from_token(request):
+    """Authorize ``Authorization: Bearer <JWT>`` requests from the token's claims."""
+    if request.headers.get("Authorization", "").startswith("Bearer "):
+        return principal_from_request()
+    return None
 
 
 v1_blueprint = Blueprint(name='v1', import_name='api1')
@@ -17,6 +26,14 @@ v1_blueprint = Blueprint(name='v1', import_name='api1')
 
 v1_blueprint.add_url_rule(
     '/health-check', view_func=health_check, methods=['GET'])
+v1_blueprint.add_url_rule(
+    '/ready', view_func=readiness_check, methods=['GET'])
+v1_blueprint.add_url_rule(
+    '/cache-stats', view_func=cache_stats, methods=['GET'])
+v1_blueprint.add_url_rule(
+    '/pool-stats', view_func=database_pool_stats, methods=['GET'])
+v1_blueprint.add_url_rule(
+    '/metrics', view_func=metrics, methods=['GET'])
 v1_blueprint.add_url_rule(
     '/user/register', view_func=register, methods=['POST'])
 v1_blueprint.add_url_rule(
@@ -31,8 +48,14 @@ v1_blueprint.add_url_rule(
     '/stock/<symbol>/history', view_func=get_stock_history, methods=['GET'])
 v1_blueprint.add_url_rule(
     '/stock/<symbol>/indicators', view_func=get_indicators, methods=['GET'])
+v1_blueprint.add_url_rule(
+    '/stock/indicators/batch', view_func=get_batch_indicators, methods=['GET'])
+v1_blueprint.add_url_rule(
+    '/stock/indicators/jobs/<job_id>', view_func=get_indicator_job, methods=['GET'])
 v1_blueprint.add_url_rule(
     '/stock/fetch', view_func=fetch_stock_data, methods=['POST'])
+v1_blueprint.add_url_rule(
+    '/stock/fetch/<job_id>', view_func=get_fetch_job, methods=['GET'])
 
 
 
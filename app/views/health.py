@@ -1,4 +1,11 @@
+import os
+
+from flask import current_app
+
+from app.extensions import db, limiter, price_cache, principal_cache, readiness
 from app.utils.common import send_json_response
+from app.utils.db_pool import pool_stats
+from app.utils.request_metrics import metrics_response
 from app.utils.constants import HttpStatusCode
 
 
@@ -8,7 +15,7 @@ def health_check():
         ---
         tags:
           - Utility
-        summary: Check if the service is running
+        summary: Check if the service is running (liveness; see /ready for readiness)
         responses:
           200:
             description: Service is up and running
@@ -24,3 +31,182 @@ def health_check():
         """
     return send_json_response(response_status=True, message_key="Details Fetched Successfully",
                               http_status=HttpStatusCode.OK.value)
+
+
+def cache_stats():
+    """
+        Cache Statistics
+        ---
+        tags:
+          - Utility
+        summary: Hit/miss/eviction counters of this worker's price frame and principal caches
+        responses:
+          200:
+            description: Cache counters of the worker that served the request
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Details Fetched Successfully"
+                data:
+                  type: object
+                  properties:
+                    pid:
+                      type: integer
+                      example: 4021
+                    price_cache:
+                      type: object
+                      example: {"entries": 12, "bytes": 5242880, "hits": 940, "misses": 31, "evictions": 0}
+                    principal_cache:
+                      type: object
+                      example: {"enabled": true, "shared": false, "entries": 3, "hits": 1022, "misses": 9}
+        """
+    data = {
+        "pid": os.getpid(),
+        "price_cache": price_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+    }
+    return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=data,
+                              http_status=HttpStatusCode.OK.value)
+
+
+def database_pool_stats():
+    """
+        Database Pool Statistics
+        ---
+        tags:
+          - Utility
+        summary: Connection pool size, utilization and checkout wait times of this worker
+        description: >
+          Counters are per process and start at zero when the worker starts. Compare
+          checked_out and wait times against the pool settings of the role to size
+          WEB_DB_POOL_SIZE / WEB_DB_MAX_OVERFLOW for the gunicorn worker count.
+          Pools other than Postgres are not instrumented and only report their status.
+        responses:
+          200:
+            description: Pool statistics of the worker that served the request
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Details Fetched Successfully"
+                data:
+                  type: object
+                  properties:
+                    pid:
+                      type: integer
+                      example: 4021
+                    role:
+                      type: string
+                      example: "web"
+                    pool:
+                      type: object
+                      example: {"size": 2, "max_overflow": 2, "checked_out": 1, "idle": 1, "overflow": 0,
+                                "utilization": 0.25, "checkouts": 5120, "timeouts": 0,
+                                "wait_seconds_total": 0.21, "wait_seconds_max": 0.004,
+                                "wait_seconds_mean": 0.00004,
+                                "wait_histogram": {"0.001": 5101, "0.01": 19, "0.1": 0, "1": 0, "+Inf": 0}}
+        """
+    data = {
+        "pid": os.getpid(),
+        "role": current_app.config["APP_ROLE"],
+        "pool": pool_stats(db.engine),
+    }
+    return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=data,
+                              http_status=HttpStatusCode.OK.value)
+
+
+@limiter.exempt
+def metrics():
+    """
+        Prometheus Metrics
+        ---
+        tags:
+          - Utility
+        summary: Request latency and per-phase histograms in the Prometheus text format
+        description: >
+          http_request_duration_seconds, http_request_phase_seconds (auth, load, compute,
+          serialize), http_response_bytes and http_request_rows, labelled by endpoint.
+          Under gunicorn the histograms of all workers are aggregated (see
+          gunicorn_config.py); otherwise they cover this process only. Not rate limited,
+          so it can be scraped.
+        produces:
+          - text/plain
+        responses:
+          200:
+            description: Metrics in the Prometheus exposition format
+            schema:
+              type: string
+              example: 'http_request_phase_seconds_bucket{endpoint="v1.get_indicators",le="0.025",phase="compute"} 118.0'
+        """
+    return metrics_response()
+
+
+@limiter.exempt
+def readiness_check():
+    """
+        Readiness Check
+        ---
+        tags:
+          - Utility
+        summary: Check whether this worker can serve traffic
+        description: >
+          Checks database latency, this worker's connection pool saturation, Redis
+          reachability, Celery queue depth and the age of the last successful nightly
+          refresh, concurrently and within READINESS_TIMEOUT. Results are cached for
+          READINESS_CACHE_TTL seconds. Returns 503 when a check listed in
+          READINESS_CRITICAL_CHECKS fails (database and pool by default). Redis and the
+          Celery queue are shared by all workers, so adding redis or celery_queue there
+          takes the whole web tier out of rotation during a Redis outage or broker
+          backlog. Not rate limited, so load balancers can poll it.
+        responses:
+          200:
+            description: Worker is ready
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Ready"
+                data:
+                  type: object
+                  example: {"ready": true, "elapsed_ms": 3.2, "age_seconds": 1.4,
+                            "checks": {"database": {"ok": true, "latency_ms": 1.1},
+                                       "pool": {"ok": true, "utilization": 0.25, "checked_out": 1,
+                                                "overflow": 0, "timeouts": 0},
+                                       "redis": {"ok": true, "servers": {"broker,fetch_jobs": {"ok": true,
+                                                                                             "latency_ms": 0.4}}},
+                                       "celery_queue": {"ok": true, "depth": 12, "queues": {"celery": 12}},
+                                       "refresh": {"ok": true, "age_seconds": 30211,
+                                                   "last_refresh": "2025-05-20T18:30:41+00:00"}}}
+          503:
+            description: Worker is not ready; error holds the same report
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Not ready"
+                error:
+                  type: object
+        """
+    result = readiness.check()
+    if result["ready"]:
+        return send_json_response(response_status=True, message_key="Ready", data=result,
+                                  http_status=HttpStatusCode.OK.value)
+    return send_json_response(response_status=False, message_key="Not ready", error=result,
+                              http_status=HttpStatusCode.SERVICE_UNAVAILABLE.value)
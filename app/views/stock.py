@@ -1,15 +1,121 @@
-from flask import Blueprint, jsonify, request
+import json
+from datetime import date
+
+from flask import Blueprint, current_app, jsonify, request, stream_with_context, url_for
 from flask_login import login_required
 
-from app.indicators.utils import get_price_history_df
+from app.utils.data_loader import (PRICE_COLUMNS, count_price_bars, get_data_version, get_price_history_df,
+                                   get_price_range, stream_price_rows)
 
-from app.services.indicator_service import calculate_indicators
-from app.services.stock_fetcher import fetch_and_store_stock_data
-from app.utils.common import send_json_response
+from app.extensions import fetch_jobs
+from app.indicators.kernels import BACKENDS
+from app.services.indicator_service import (calculate_batch_indicators, calculate_indicator_columns,
+                                            calculate_indicators, estimate_indicator_cost, requested_specs,
+                                            warmup_bars)
+from app.utils import binary_format, columnar
+from app.utils.common import send_binary_response, send_json_response, send_raw_json_response
+from app.utils.conditional import check_not_modified
+from app.utils.request_metrics import phase
 from app.utils.constants import HttpStatusCode
 
 stock_bp = Blueprint("stock", __name__)
 
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson")
+
+# Formats that can be chosen through the Accept header, JSON first so that */* picks it
+_FORMAT_MIMETYPES = (("application/json", "json"),) + tuple((mimetype, "ndjson") for mimetype in NDJSON_MIMETYPES) + (
+    (binary_format.MIMETYPE, "binary"),
+)
+
+# Celery task states as reported by /stock/indicators/jobs/<job_id>; ids this API never issued get a 404 first
+_JOB_STATES = {"PENDING": "queued", "RECEIVED": "queued", "STARTED": "running", "RETRY": "running",
+               "SUCCESS": "done", "FAILURE": "failed", "REVOKED": "failed"}
+
+
+def _parse_indicator_args() -> dict:
+    rsi = request.args.get("rsi", "false").lower() == "true"
+    macd = request.args.get("macd", "false").lower() == "true"
+    sma = request.args.getlist("sma", type=int)  # ?sma=20&sma=50
+    ema = request.args.getlist("ema", type=int)  # ?ema=12&ema=26
+
+    return {
+        "rsi": rsi,
+        "macd": macd,
+        "sma": sma if sma else [],
+        "ema": ema if ema else [],
+    }
+
+
+def _parse_range_args() -> tuple:
+    """Read ?start=YYYY-MM-DD&end=YYYY-MM-DD&limit=N, raising ValueError on bad values."""
+    start = request.args.get("start")
+    end = request.args.get("end")
+    limit = request.args.get("limit")
+
+    start = date.fromisoformat(start) if start else None
+    end = date.fromisoformat(end) if end else None
+    limit = int(limit) if limit else None
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be a positive integer")
+    if start is not None and end is not None and start > end:
+        raise ValueError("start must not be after end")
+    return start, end, limit
+
+
+def _parse_format_args(formats=("json", "columnar", "binary")) -> tuple:
+    """
+    Read ?format=...&dates=iso|epoch&dtype=float64|float32. Without a format
+    parameter the Accept header picks one of ``formats``, defaulting to JSON.
+
+    Returns:
+        tuple: (response format, date format, float dtype). Raises ValueError on bad values.
+    """
+    response_format = request.args.get("format")
+    if response_format is None:
+        offered = [(mimetype, name) for mimetype, name in _FORMAT_MIMETYPES if name in formats]
+        best = request.accept_mimetypes.best_match([mimetype for mimetype, _ in offered])
+        response_format = dict(offered).get(best, "json")
+    if response_format not in formats:
+        raise ValueError(f"Unknown format: {response_format}")
+    date_format = request.args.get("dates", "iso")
+    if date_format not in columnar.DATE_FORMATS:
+        raise ValueError(f"Unknown date format: {date_format}")
+    float_dtype = request.args.get("dtype", "float64")
+    if float_dtype not in binary_format.FLOAT_DTYPES:
+        raise ValueError(f"Unknown dtype: {float_dtype}")
+    return response_format, date_format, float_dtype
+
+
+def _exceeds_async_threshold(bars: int, indicators: dict) -> bool:
+    threshold = current_app.config["INDICATOR_ASYNC_COST_THRESHOLD"]
+    return threshold > 0 and estimate_indicator_cost(bars, indicators) > threshold
+
+
+def _queue_indicator_job(task_name: str, args: list) -> tuple:
+    """Send an indicator computation to Celery and answer 202 with where to collect its result."""
+    from app import celery_app
+
+    job = celery_app.send_task(task_name, args=args)
+    fetch_jobs.record_indicator_job(job.id)
+    data = {"id": job.id, "state": "queued", "result_url": url_for("v1.get_indicator_job", job_id=job.id)}
+    return send_json_response(response_status=True, message_key="Indicator job queued", data=data,
+                              http_status=HttpStatusCode.ACCEPTED.value)
+
+
+def _stream_history(symbol: str, start, end, limit, date_format: str):
+    """Stream price history as one JSON object per line, reading the database in batches."""
+    batch_size = current_app.config["HISTORY_STREAM_BATCH_SIZE"]
+
+    def generate():
+        for rows in stream_price_rows(symbol, PRICE_COLUMNS, start, end, limit, batch_size):
+            yield "".join(
+                json.dumps(dict(zip(PRICE_COLUMNS, (columnar.date_value(row[0], date_format),) + tuple(row[1:]))),
+                           separators=(",", ":")) + "\n"
+                for row in rows
+            )
+
+    return current_app.response_class(stream_with_context(generate()), mimetype=NDJSON_MIMETYPES[0])
+
 
 @login_required
 def get_stock_history(symbol):
@@ -25,6 +131,50 @@ def get_stock_history(symbol):
             schema:
               type: string
             description: Ticker symbol of the stock (e.g., AAPL, TSLA)
+          - name: start
+            in: query
+            required: false
+            schema:
+              type: string
+              format: date
+            description: First date to return (YYYY-MM-DD)
+          - name: end
+            in: query
+            required: false
+            schema:
+              type: string
+              format: date
+            description: Last date to return (YYYY-MM-DD)
+          - name: limit
+            in: query
+            required: false
+            schema:
+              type: integer
+            description: Only return the most recent N bars between start and end
+          - name: format
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [json, columnar, ndjson, binary]
+            description: "columnar returns one array per field, with null for missing values. ndjson streams
+              one bar per line (also selected by Accept: application/x-ndjson). binary returns the column
+              layout documented in app/utils/binary_format.py (also selected by
+              Accept: application/vnd.stock-columns)"
+          - name: dates
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [iso, epoch]
+            description: Date encoding of the columnar and ndjson formats, ISO strings or days since 1970-01-01
+          - name: dtype
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [float64, float32]
+            description: Float width of the binary format
         responses:
           200:
             description: Historical price data fetched successfully
@@ -64,6 +214,19 @@ def get_stock_history(symbol):
                       volume:
                         type: integer
                         example: 163224100
+          304:
+            description: Not modified since the version identified by If-None-Match or If-Modified-Since
+          400:
+            description: Invalid start, end, limit or format
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Invalid parameters"
           404:
             description: Stock not found
             schema:
@@ -76,12 +239,44 @@ def get_stock_history(symbol):
                   type: string
                   example: "Stock not found"
         """
-    df = get_price_history_df(symbol.upper())
-    if df.empty:
+    try:
+        start, end, limit = _parse_range_args()
+        response_format, date_format, float_dtype = _parse_format_args(("json", "columnar", "ndjson", "binary"))
+    except ValueError as e:
+        return send_json_response(response_status=False, message_key="Invalid parameters", error=str(e),
+                                  http_status=HttpStatusCode.BAD_REQUEST.value)
+
+    symbol = symbol.upper()
+    version = get_data_version(symbol)
+    if version is None:
         return send_json_response(response_status=False, message_key="Stock not found",
                                   http_status=HttpStatusCode.NOT_FOUND.value)
 
-    data = df.to_dict(orient="records")
+    not_modified = check_not_modified(symbol, version, response_format)
+    if not_modified is not None:
+        return not_modified
+
+    if response_format == "ndjson":
+        return _stream_history(symbol, start, end, limit, date_format), HttpStatusCode.OK.value
+
+    if start is None and end is None and limit is None:
+        df = get_price_history_df(symbol, version)
+    else:
+        df, _ = get_price_range(symbol, start=start, end=end, limit=limit, version=version)
+
+    if response_format == "binary":
+        return send_binary_response(chunks=binary_format.encode(df, float_dtype), mimetype=binary_format.MIMETYPE,
+                                    http_status=HttpStatusCode.OK.value)
+
+    if response_format == "columnar":
+        with phase("serialize"):
+            data = {"date": columnar.date_column(df["date"], date_format)}
+            data.update((name, columnar.value_column(df[name])) for name in df.columns if name != "date")
+        return send_raw_json_response(response_status=True, message_key="Details Fetched Successfully",
+                                      data_json=columnar.dumps(data), http_status=HttpStatusCode.OK.value)
+
+    with phase("serialize"):
+        data = df.to_dict(orient="records")
     return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=data,
                               http_status=HttpStatusCode.OK.value)
 
@@ -128,6 +323,56 @@ def get_indicators(symbol):
               items:
                 type: integer
             description: List of EMA periods (e.g., ?ema=12&ema=26)
+          - name: backend
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [pandas, numpy]
+            description: Compute backend, defaults to the server's INDICATOR_BACKEND setting
+          - name: start
+            in: query
+            required: false
+            schema:
+              type: string
+              format: date
+            description: First date to return (YYYY-MM-DD)
+          - name: end
+            in: query
+            required: false
+            schema:
+              type: string
+              format: date
+            description: Last date to return (YYYY-MM-DD)
+          - name: limit
+            in: query
+            required: false
+            schema:
+              type: integer
+            description: Only return the most recent N values between start and end
+          - name: format
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [json, columnar, binary]
+            description: "columnar returns one array per field, with null for missing values. binary returns
+              the column layout documented in app/utils/binary_format.py, with columns named date, rsi,
+              macd.macd_line, sma.20, ... (also selected by Accept: application/vnd.stock-columns)"
+          - name: dates
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [iso, epoch]
+            description: Date encoding of the columnar format, ISO strings or days since 1970-01-01
+          - name: dtype
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [float64, float32]
+            description: Float width of the binary format
         responses:
           200:
             description: Indicators calculated successfully
@@ -159,6 +404,37 @@ def get_indicators(symbol):
                             format: float
                           example: [59.11, 69.35, 68.38]
                     # Other indicators (macd, sma, ema) will follow a similar structure
+          202:
+            description: >
+              The request's estimated cost (bars x indicator series) is above
+              INDICATOR_ASYNC_COST_THRESHOLD, so it was queued as a background
+              job; collect the result from result_url (binary responses are always computed inline)
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Indicator job queued"
+                data:
+                  type: object
+                  example: {"id": "8d3f1c2a-5b7e-4f0a-9c6d-2e1b4a7f9c30", "state": "queued",
+                            "result_url": "/api/v1/stock/indicators/jobs/8d3f1c2a-5b7e-4f0a-9c6d-2e1b4a7f9c30"}
+          304:
+            description: Not modified since the version identified by If-None-Match or If-Modified-Since
+          400:
+            description: Unknown backend or invalid start, end, limit or format
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Invalid parameters"
           404:
             description: Indicator calculation error
             schema:
@@ -188,25 +464,209 @@ def get_indicators(symbol):
                   type: string
                   example: "Unexpected error"
         """
+    backend = request.args.get("backend")
+    if backend is not None and backend not in BACKENDS:
+        return send_json_response(response_status=False, message_key=f"Unknown backend: {backend}",
+                                  http_status=HttpStatusCode.BAD_REQUEST.value)
+
+    try:
+        start, end, limit = _parse_range_args()
+        response_format, date_format, float_dtype = _parse_format_args()
+        date_format = date_format if response_format == "columnar" else None
+    except ValueError as e:
+        return send_json_response(response_status=False, message_key="Invalid parameters", error=str(e),
+                                  http_status=HttpStatusCode.BAD_REQUEST.value)
+
     try:
-        rsi = request.args.get("rsi", "false").lower() == "true"
-        macd = request.args.get("macd", "false").lower() == "true"
-        sma = request.args.getlist("sma", type=int)  # ?sma=20&sma=50
-        ema = request.args.getlist("ema", type=int)  # ?ema=12&ema=26
+        indicators = _parse_indicator_args()
+
+        version = get_data_version(symbol.upper())
+        if version is None:
+            return send_json_response(response_status=False, message_key="Error occurred !",
+                                      error={"error": "No price data found for symbol"},
+                                      http_status=HttpStatusCode.NOT_FOUND.value)
+
+        not_modified = check_not_modified(symbol.upper(), version, response_format)
+        if not_modified is not None:
+            return not_modified
+
+        if response_format != "binary" and _exceeds_async_threshold(version[1], indicators):
+            # Too heavy over the whole history; a range only loads its bars plus the warmup
+            warmup = warmup_bars(requested_specs(indicators))
+            bars = version[1]
+            if start is not None or end is not None:
+                bars = min(bars, count_price_bars([symbol.upper()], start, end) + warmup)
+            if limit is not None:
+                bars = min(bars, limit + warmup)
+            if _exceeds_async_threshold(bars, indicators):
+                return _queue_indicator_job("tasks.indicators_job_task", [
+                    symbol.upper(), indicators, backend, start.isoformat() if start else None,
+                    end.isoformat() if end else None, limit, date_format,
+                ])
 
-        indicators = {
-            "rsi": rsi,
-            "macd": macd,
-            "sma": sma if sma else [],
-            "ema": ema if ema else [],
-        }
+        if response_format == "binary":
+            columns = calculate_indicator_columns(symbol, indicators, backend=backend, start=start, end=end,
+                                                  limit=limit, version=version)
+            if "error" in columns:
+                return send_json_response(response_status=False, message_key="Error occurred !", error=columns,
+                                          http_status=HttpStatusCode.NOT_FOUND.value)
+            return send_binary_response(chunks=binary_format.encode(columns, float_dtype),
+                                        mimetype=binary_format.MIMETYPE, http_status=HttpStatusCode.OK.value)
 
-        result = calculate_indicators(symbol, indicators)
+        result = calculate_indicators(symbol, indicators, backend=backend, start=start, end=end, limit=limit,
+                                      date_format=date_format, version=version)
 
         if "error" in result:
             return send_json_response(response_status=False, message_key="Error occurred !", error=result,
                                       http_status=HttpStatusCode.NOT_FOUND.value)
 
+        if date_format is not None:
+            return send_raw_json_response(response_status=True, message_key="Details Fetched Successfully",
+                                          data_json=columnar.dumps(result), http_status=HttpStatusCode.OK.value)
+
+        return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=result,
+                                  http_status=HttpStatusCode.OK.value)
+
+    except Exception as e:
+        return send_json_response(response_status=False, message_key="Error occurred !", error=str(e),
+                                  http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value)
+
+
+@login_required
+def get_batch_indicators():
+    """
+        Get technical indicators for many stocks in one request
+        ---
+        tags:
+          - Stock
+        parameters:
+          - name: symbols
+            in: query
+            required: true
+            schema:
+              type: array
+              items:
+                type: string
+            description: Ticker symbols, repeated or comma separated (e.g., ?symbols=AAPL,TSLA&symbols=NVDA)
+          - name: rsi
+            in: query
+            required: false
+            schema:
+              type: boolean
+            description: Include RSI indicator (true/false)
+          - name: macd
+            in: query
+            required: false
+            schema:
+              type: boolean
+            description: Include MACD indicator (true/false)
+          - name: sma
+            in: query
+            required: false
+            schema:
+              type: array
+              items:
+                type: integer
+            description: List of SMA periods (e.g., ?sma=20&sma=50)
+          - name: ema
+            in: query
+            required: false
+            schema:
+              type: array
+              items:
+                type: integer
+            description: List of EMA periods (e.g., ?ema=12&ema=26)
+          - name: backend
+            in: query
+            required: false
+            schema:
+              type: string
+              enum: [pandas, numpy]
+            description: Compute backend, defaults to the server's INDICATOR_BACKEND setting
+        responses:
+          200:
+            description: Indicators calculated successfully
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Details Fetched Successfully"
+                data:
+                  type: object
+                  description: Indicators per symbol, in the same format as /stock/{symbol}/indicators
+                  example: {"AAPL": {"x": ["2024-05-03"], "rsi": {"y": [59.11]}},
+                            "XXXX": {"error": "No price data found for symbol"}}
+          202:
+            description: >
+              The request's estimated cost (bars x indicator series) is above
+              INDICATOR_ASYNC_COST_THRESHOLD, so it was queued as a background
+              job; collect the result from result_url
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Indicator job queued"
+                data:
+                  type: object
+                  example: {"id": "8d3f1c2a-5b7e-4f0a-9c6d-2e1b4a7f9c30", "state": "queued",
+                            "result_url": "/api/v1/stock/indicators/jobs/8d3f1c2a-5b7e-4f0a-9c6d-2e1b4a7f9c30"}
+          400:
+            description: Missing or too many symbols
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Missing symbols"
+          500:
+            description: Internal server error
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Error occurred !"
+                error:
+                  type: string
+                  example: "Unexpected error"
+        """
+    symbols = [symbol.strip() for value in request.args.getlist("symbols")
+               for symbol in value.split(",") if symbol.strip()]
+    if not symbols:
+        return send_json_response(response_status=False, message_key="Missing symbols",
+                                  http_status=HttpStatusCode.BAD_REQUEST.value)
+
+    max_symbols = current_app.config["BATCH_INDICATORS_MAX_SYMBOLS"]
+    if len(symbols) > max_symbols:
+        return send_json_response(response_status=False, message_key=f"At most {max_symbols} symbols allowed",
+                                  http_status=HttpStatusCode.BAD_REQUEST.value)
+
+    backend = request.args.get("backend")
+    if backend is not None and backend not in BACKENDS:
+        return send_json_response(response_status=False, message_key=f"Unknown backend: {backend}",
+                                  http_status=HttpStatusCode.BAD_REQUEST.value)
+
+    try:
+        indicators = _parse_indicator_args()
+        if current_app.config["INDICATOR_ASYNC_COST_THRESHOLD"] and _exceeds_async_threshold(
+                count_price_bars([symbol.upper() for symbol in symbols]), indicators):
+            return _queue_indicator_job("tasks.batch_indicators_job_task", [symbols, indicators, backend])
+
+        result = calculate_batch_indicators(symbols, indicators, backend=backend)
         return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=result,
                                   http_status=HttpStatusCode.OK.value)
 
@@ -218,10 +678,15 @@ def get_indicators(symbol):
 @login_required
 def fetch_stock_data():
     """
-        Fetch and store stock data for a given symbol
+        Queue a fetch of stock data for a given symbol
         ---
         tags:
           - Stock
+        description: >
+          Enqueues a background job that downloads and stores the symbol's
+          latest bars and returns its id right away. A request for a symbol
+          whose job is still queued or running returns that job instead of
+          starting another one. Poll /stock/fetch/{job_id} for the outcome.
         requestBody:
           required: true
           content:
@@ -235,8 +700,8 @@ def fetch_stock_data():
                     type: string
                     example: "NVDA"
         responses:
-          200:
-            description: Data fetched and stored successfully
+          202:
+            description: Fetch job queued, or already in flight for this symbol
             schema:
               type: object
               properties:
@@ -245,7 +710,12 @@ def fetch_stock_data():
                   example: true
                 message:
                   type: string
-                  example: "Data fetched and stored for NVDA"
+                  example: "Fetch queued for NVDA"
+                data:
+                  type: object
+                  example: {"id": "5f0c9d1e6b2a4c4f8e3b7a9d2c1e0f4a", "symbol": "NVDA", "state": "queued",
+                            "created_at": "2024-06-03T18:30:00.123456+00:00",
+                            "status_url": "/api/v1/stock/fetch/5f0c9d1e6b2a4c4f8e3b7a9d2c1e0f4a"}
           400:
             description: Missing symbol in request body
             schema:
@@ -258,7 +728,7 @@ def fetch_stock_data():
                   type: string
                   example: "Missing symbol"
           500:
-            description: Server error during data fetch
+            description: Server error while queueing the fetch
             schema:
               type: object
               properties:
@@ -270,17 +740,168 @@ def fetch_stock_data():
                   example: "Error occurred !"
                 error:
                   type: string
-                  example: "Something went wrong while fetching data."
+                  example: "Error 111 connecting to localhost:6379. Connection refused."
         """
     symbol = request.json.get("symbol")
     if not symbol:
         return send_json_response(response_status=False, message_key="Missing symbol",
                                   http_status=HttpStatusCode.BAD_REQUEST.value)
+    symbol = symbol.upper()
 
     try:
-        fetch_and_store_stock_data(symbol)
-        return send_json_response(response_status=True, message_key=f"Data fetched and stored for {symbol}",
-                                  http_status=HttpStatusCode.OK.value)
+        job, created = fetch_jobs.claim(symbol)
+        if created:
+            from app import celery_app
+
+            try:
+                celery_app.send_task("tasks.fetch_symbol_task", args=[symbol, job["id"]])
+            except Exception as e:
+                fetch_jobs.fail(job["id"], symbol, f"Could not queue the fetch: {e}")
+                raise
+        job["status_url"] = url_for("v1.get_fetch_job", job_id=job["id"])
+        message = f"Fetch queued for {symbol}" if created else f"Fetch already in progress for {symbol}"
+        return send_json_response(response_status=True, message_key=message, data=job,
+                                  http_status=HttpStatusCode.ACCEPTED.value)
     except Exception as e:
         return send_json_response(response_status=False, message_key="Error occurred !", error=str(e),
                                   http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value)
+
+
+@login_required
+def get_fetch_job(job_id):
+    """
+        Status of a queued stock data fetch
+        ---
+        tags:
+          - Stock
+        parameters:
+          - name: job_id
+            in: path
+            type: string
+            required: true
+            description: Job id returned by POST /stock/fetch
+        responses:
+          200:
+            description: >
+              Job state: queued, running, done (with the number of bars
+              inserted and updated, and result "ok" or "empty" when the
+              provider had no new bars) or failed (with the error, "Worker lost"
+              when the job stopped without finishing)
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Details Fetched Successfully"
+                data:
+                  type: object
+                  example: {"id": "5f0c9d1e6b2a4c4f8e3b7a9d2c1e0f4a", "symbol": "NVDA", "state": "done",
+                            "created_at": "2024-06-03T18:30:00.123456+00:00",
+                            "started_at": "2024-06-03T18:30:00.421337+00:00",
+                            "finished_at": "2024-06-03T18:30:02.904512+00:00",
+                            "inserted": 3, "updated": 0, "result": "ok"}
+          404:
+            description: Unknown or expired job id
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Job not found"
+        """
+    try:
+        job = fetch_jobs.get(job_id)
+    except Exception as e:
+        return send_json_response(response_status=False, message_key="Error occurred !", error=str(e),
+                                  http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value)
+    if job is None:
+        return send_json_response(response_status=False, message_key="Job not found",
+                                  http_status=HttpStatusCode.NOT_FOUND.value)
+    return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=job,
+                              http_status=HttpStatusCode.OK.value)
+
+
+@login_required
+def get_indicator_job(job_id):
+    """
+        Result of a background indicators job
+        ---
+        tags:
+          - Stock
+        parameters:
+          - name: job_id
+            in: path
+            type: string
+            required: true
+            description: Job id returned with a 202 by /stock/{symbol}/indicators or /stock/indicators/batch
+        responses:
+          200:
+            description: >
+              The job is done; data holds the same payload the original request
+              would have returned inline
+          202:
+            description: The job is queued or running
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: true
+                message:
+                  type: string
+                  example: "Indicator job running"
+                data:
+                  type: object
+                  example: {"id": "8d3f1c2a-5b7e-4f0a-9c6d-2e1b4a7f9c30", "state": "running"}
+          404:
+            description: No job with this id was issued (or its result expired), or an indicator calculation error
+          500:
+            description: The job failed
+            schema:
+              type: object
+              properties:
+                status:
+                  type: boolean
+                  example: false
+                message:
+                  type: string
+                  example: "Indicator job failed"
+                error:
+                  type: string
+                  example: "division by zero"
+        """
+    from app import celery_app
+
+    try:
+        # Celery reports ids it does not know as PENDING, so only ids handed out by this API are polled
+        if not fetch_jobs.indicator_job_exists(job_id):
+            return send_json_response(response_status=False, message_key="Job not found",
+                                      http_status=HttpStatusCode.NOT_FOUND.value)
+        job = celery_app.AsyncResult(job_id)
+        state = _JOB_STATES.get(job.state, "queued")
+        if state == "failed":
+            return send_json_response(response_status=False, message_key="Indicator job failed", error=str(job.result),
+                                      http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value)
+        if state != "done":
+            return send_json_response(response_status=True, message_key=f"Indicator job {state}",
+                                      data={"id": job_id, "state": state}, http_status=HttpStatusCode.ACCEPTED.value)
+        payload = job.result
+    except Exception as e:
+        return send_json_response(response_status=False, message_key="Error occurred !", error=str(e),
+                                  http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value)
+
+    result = payload["data"]
+    if "error" in result:
+        return send_json_response(response_status=False, message_key="Error occurred !", error=result,
+                                  http_status=HttpStatusCode.NOT_FOUND.value)
+    if payload["date_format"] is not None:
+        return send_raw_json_response(response_status=True, message_key="Details Fetched Successfully",
+                                      data_json=columnar.dumps(result), http_status=HttpStatusCode.OK.value)
+    return send_json_response(response_status=True, message_key="Details Fetched Successfully", data=result,
+                              http_status=HttpStatusCode.OK.value)
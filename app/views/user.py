@@ -1,6 +1,6 @@
 from flask import request, jsonify
 from app.models.user import User
-from app.extensions import db
+from app.extensions import db, principal_cache
 from flask_login import login_user, logout_user, login_required, current_user
 from app.utils.common import send_json_response
 from app.utils.constants import HttpStatusCode
@@ -111,6 +111,15 @@ def login():
             message:
               type: string
               example: "Login successful"
+            data:
+              type: object
+              properties:
+                access_token:
+                  type: string
+                  description: >
+                    JWT accepted as "Authorization: Bearer <token>" by every
+                    endpoint that needs a login, authorized from its claims alone
+                  example: "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
       400:
         description: Missing email or password
         schema:
@@ -153,6 +162,7 @@ def login():
 
     login_user(user, remember=True)
     return send_json_response(response_status=True, message_key="Login successful",
+                              data={"access_token": User.generate_token(user)},
                               http_status=HttpStatusCode.OK.value)
 
 
@@ -176,6 +186,7 @@ def logout():
               type: string
               example: "Logout successful"
     """
+    principal_cache.invalidate(current_user.id)
     logout_user()
     return send_json_response(response_status=True, message_key="Logout successful",
                               http_status=HttpStatusCode.OK.value)
@@ -0,0 +1,35 @@
+"""Compare one batched indicators call for many symbols with one call per symbol.
+
+Usage:
+    python -m benchmarks.bench_batch_indicators [n_symbols] [n_bars]
+"""
+import sys
+
+from benchmarks.common import best_of, make_bench_app, seed_symbol
+
+INDICATORS = {"rsi": True, "macd": True, "sma": [20, 50, 200], "ema": [12, 26]}
+
+
+def main(n_symbols: int, n_bars: int):
+    from app.extensions import price_cache
+    from app.services.indicator_service import calculate_batch_indicators, calculate_indicators
+
+    app = make_bench_app()
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    with app.app_context():
+        for i, symbol in enumerate(symbols):
+            seed_symbol(symbol, n_bars, seed=i)
+
+        # Measure cold loads, not the per-worker frame cache
+        price_cache.enabled = False
+        single = best_of(lambda: [calculate_indicators(symbol, INDICATORS) for symbol in symbols], repeat=3)
+        batched = best_of(lambda: calculate_batch_indicators(symbols, INDICATORS), repeat=3)
+
+    print(f"{n_symbols} symbols x {n_bars} bars")
+    print(f"  {n_symbols} single calls: {single * 1e3:10.1f} ms")
+    print(f"  1 batched call:   {batched * 1e3:10.1f} ms  ({single / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [100, 2_500][len(args):]))
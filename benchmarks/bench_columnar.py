@@ -0,0 +1,89 @@
+"""Compare the row-oriented JSON, columnar JSON and binary responses of the history and indicator views.
+
+Views are called directly inside a request context with the price frame
+already cached, so timings cover building and serializing the payload
+(plus computing the indicators, which is the same for every format).
+Binary responses are first checked to go through a WSGI server that, like
+gunicorn, only writes ``bytes``.
+
+Usage:
+    python -m benchmarks.bench_columnar [n_bars]
+"""
+import sys
+
+from benchmarks.common import best_of, make_bench_app, seed_symbol
+
+INDICATORS = "rsi=true&macd=true&sma=20&sma=50&sma=200&ema=12&ema=26"
+
+FORMATS = {
+    "rows": "",
+    "columnar iso": "format=columnar",
+    "columnar epoch": "format=columnar&dates=epoch",
+    "binary": "format=binary",
+    "binary float32": "format=binary&dtype=float32",
+}
+
+
+def check_wsgi_body(app, url: str) -> int:
+    """
+    Run ``url`` through the WSGI app and write its body the way gunicorn does,
+    rejecting any chunk that is not ``bytes``.
+
+    Returns:
+        int: Body size, checked against the Content-Length header
+    """
+    from werkzeug.test import EnvironBuilder
+
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"], started["headers"] = status, dict(headers)
+
+    body = app(EnvironBuilder(path=url).get_environ(), start_response)
+    size = 0
+    try:
+        for chunk in body:
+            if not isinstance(chunk, bytes):
+                raise TypeError(f"{url}: {type(chunk).__name__} is not a byte string")
+            size += len(chunk)
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+    assert started["status"].startswith("200"), (url, started["status"])
+    assert int(started["headers"]["Content-Length"]) == size, (url, started["headers"]["Content-Length"], size)
+    return size
+
+
+def main(n_bars: int):
+    from app.extensions import limiter
+    from app.views.stock import get_indicators, get_stock_history
+
+    app = make_bench_app()
+    app.config["LOGIN_DISABLED"] = True
+    limiter.enabled = False  # the default limit would reject the checks
+    with app.app_context():
+        seed_symbol("BIG", n_bars)
+
+    for url in ("/api/v1/stock/BIG/history?format=binary", f"/api/v1/stock/BIG/indicators?{INDICATORS}&format=binary"):
+        check_wsgi_body(app, url)
+
+    def respond(view, query):
+        with app.test_request_context(f"/?{query}"):
+            response, _ = view("BIG")
+            return len(response.get_data())
+
+    print(f"1 symbol x {n_bars} bars")
+    for name, view, query in (("history", get_stock_history, ""), ("indicators", get_indicators, INDICATORS)):
+        respond(view, query)  # fill the price cache
+        baseline = None
+        for label, fmt in FORMATS.items():
+            full_query = "&".join(part for part in (query, fmt) if part)
+            size = respond(view, full_query)
+            elapsed = best_of(lambda: respond(view, full_query), repeat=5)
+            baseline = baseline or (elapsed, size)
+            print(f"  {name:<10} {label:<15} {elapsed * 1e3:8.1f} ms {size / 1e6:8.2f} MB"
+                  f"  ({baseline[0] / elapsed:.1f}x faster, {size / baseline[1]:.0%} of the size)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
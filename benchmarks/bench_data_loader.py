@@ -0,0 +1,59 @@
+"""Compare the ORM-based price history loader with the columnar Core loader.
+
+Usage:
+    python -m benchmarks.bench_data_loader [n_bars ...]
+"""
+import sys
+
+import pandas as pd
+
+from benchmarks.common import best_of, make_bench_app, seed_symbol
+
+
+def legacy_get_price_history_df(symbol: str) -> pd.DataFrame:
+    """The loader as it was before the columnar rewrite: ORM objects, then dicts, then a frame."""
+    from app.extensions import db
+    from app.models.price_history import PriceHistory
+
+    records = (
+        db.session.query(PriceHistory)
+        .filter(PriceHistory.symbol == symbol)
+        .order_by(PriceHistory.date.asc())
+        .all()
+    )
+    if not records:
+        return pd.DataFrame()
+
+    data = [{
+        'date': record.date,
+        'open': record.open,
+        'high': record.high,
+        'low': record.low,
+        'close': record.close,
+        'volume': record.volume
+    } for record in records]
+    return pd.DataFrame(data)
+
+
+def main(sizes):
+    from app.extensions import db
+    from app.utils.data_loader import load_price_history_df
+
+    app = make_bench_app()
+    print(f"{'bars':>10} {'legacy rows/s':>15} {'columnar rows/s':>17} {'speedup':>8}")
+    with app.app_context():
+        for i, n_bars in enumerate(sizes):
+            symbol = f"BENCH{i}"
+            seed_symbol(symbol, n_bars, seed=i)
+
+            def run_legacy():
+                legacy_get_price_history_df(symbol)
+                db.session.expunge_all()
+
+            legacy = best_of(run_legacy)
+            columnar = best_of(lambda: load_price_history_df(symbol))
+            print(f"{n_bars:>10} {n_bars / legacy:>15,.0f} {n_bars / columnar:>17,.0f} {legacy / columnar:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [2_500, 10_000, 50_000])
@@ -0,0 +1,52 @@
+"""Measure fetch throughput offline against the replay market data provider.
+
+Every run stores a year of synthetic bars for ``n_symbols`` new symbols,
+with ``latency`` seconds of simulated download time per symbol, at each
+concurrency level. Indicator materialization is skipped so the numbers
+cover downloading and storing only.
+
+Usage:
+    python -m benchmarks.bench_fetch [n_symbols] [latency] [error_rate]
+"""
+import sys
+import time
+
+from benchmarks.common import make_bench_app
+
+CONCURRENCY = (1, 4, 8, 16)
+
+
+def main(n_symbols: int, latency: float, error_rate: float):
+    from app.extensions import db
+    from app.models import PriceHistory, Stock
+    from app.services.market_data import ReplayProvider
+    from app.services.stock_fetcher import fetch_and_store_stock_data
+
+    app = make_bench_app()
+    provider = ReplayProvider(latency=latency, jitter=latency / 2, error_rate=error_rate)
+    results = []
+    with app.app_context():
+        for run, concurrency in enumerate(CONCURRENCY):
+            symbols = [f"R{run}{i:04d}" for i in range(n_symbols)]
+            db.session.add_all(Stock(symbol=sym, name=sym) for sym in symbols)
+            db.session.commit()
+
+            start = time.perf_counter()
+            summary = fetch_and_store_stock_data(symbols=symbols, concurrency=concurrency, provider=provider,
+                                                 refresh_derived=False)
+            elapsed = time.perf_counter() - start
+            bars = PriceHistory.query.filter(PriceHistory.symbol.in_(symbols)).count()
+            failed = sum(t["status"] == "failed" for t in summary["timings"].values())
+            results.append((concurrency, elapsed, bars, failed))
+
+    print(f"\n{n_symbols} symbols, {latency * 1e3:.0f} ms latency (+{latency * 500:.0f} ms jitter), "
+          f"{error_rate:.0%} errors")
+    print(f"{'concurrency':>11} {'elapsed':>9} {'symbols/s':>10} {'bars/s':>9} {'failed':>7}")
+    for concurrency, elapsed, bars, failed in results:
+        print(f"{concurrency:>11} {elapsed:>8.2f}s {n_symbols / elapsed:>10.1f} {bars / elapsed:>9.0f} {failed:>7}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 100, float(args[1]) if len(args) > 1 else 0.1,
+         float(args[2]) if len(args) > 2 else 0.0)
@@ -0,0 +1,81 @@
+"""Time a one-bar incremental indicator refresh against a full recompute,
+and check that both give the same values.
+
+Usage:
+    python -m benchmarks.bench_incremental [n_bars ...]
+"""
+import sys
+from datetime import timedelta
+
+import numpy as np
+
+from benchmarks.common import best_of, make_bench_app, seed_symbol
+
+
+def full_recompute(symbol):
+    from app.indicators.ema import compute_ema
+    from app.indicators.macd import compute_macd
+    from app.indicators.rsi import compute_rsi
+    from app.indicators.sma import compute_sma
+    from app.utils.data_loader import load_price_history_df
+
+    close = load_price_history_df(symbol, ("date", "close"))["close"]
+    return {
+        ("rsi", "14"): compute_rsi(close, 14).to_numpy(),
+        ("macd", "12,26,9"): np.column_stack(compute_macd(close, 12, 26, 9)),
+        ("sma", "20"): compute_sma(close, 20).to_numpy(),
+        ("sma", "50"): compute_sma(close, 50).to_numpy(),
+        ("sma", "200"): compute_sma(close, 200).to_numpy(),
+        ("ema", "12"): compute_ema(close, 12).to_numpy(),
+        ("ema", "26"): compute_ema(close, 26).to_numpy(),
+    }
+
+
+def append_bar(symbol, day):
+    from app.extensions import db
+    from app.models import PriceHistory, Stock
+
+    table = PriceHistory.__table__
+    last = db.session.query(table.c.date, table.c.close).filter(table.c.symbol == symbol) \
+        .order_by(table.c.date.desc()).first()
+    stock = Stock.query.filter_by(symbol=symbol).first()
+    close = last.close * (1 + 0.01 * np.sin(day))
+    db.session.execute(table.insert(), [{
+        "stock_id": stock.id, "symbol": symbol, "date": last.date + timedelta(days=1),
+        "open": close, "high": close, "low": close, "close": close, "volume": 1000,
+    }])
+    db.session.commit()
+
+
+def main(sizes):
+    from app.services.indicator_engine import advance_indicator_states
+
+    app = make_bench_app()
+    print(f"{'bars':>10} {'full (ms)':>10} {'incremental (ms)':>17} {'max abs diff':>13}")
+    with app.app_context():
+        for i, n_bars in enumerate(sizes):
+            symbol = f"BENCH{i}"
+            seed_symbol(symbol, n_bars, seed=i)
+            advance_indicator_states(symbol)
+
+            day = iter(range(1_000_000))
+
+            def run_incremental():
+                append_bar(symbol, next(day))
+                return advance_indicator_states(symbol)
+
+            full = best_of(lambda: full_recompute(symbol))
+            incremental = best_of(run_incremental)
+
+            # Outputs of one more incremental step must equal the tail of a full recompute
+            latest = run_incremental()
+            expected = full_recompute(symbol)
+            max_diff = max(
+                float(np.nanmax(np.abs(np.asarray(values, dtype=float) - expected[key][-len(values):]), initial=0.0))
+                for key, (_, values) in latest.items()
+            )
+            print(f"{n_bars:>10} {full * 1e3:>10.2f} {incremental * 1e3:>17.2f} {max_diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [2_500, 10_000, 50_000])
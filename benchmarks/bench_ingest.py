@@ -0,0 +1,82 @@
+"""Compare the row-by-row ORM ingestion of a yfinance frame with the set-based upsert.
+
+Each run stores a fresh symbol's history into an empty table, then re-stores
+the same frame so the second half of the benchmark is all conflicts.
+
+Usage:
+    python -m benchmarks.bench_ingest [n_bars ...]
+"""
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+
+from benchmarks.common import make_bench_app, synthetic_prices
+
+
+def yfinance_frame(n_bars: int, seed: int = 0) -> pd.DataFrame:
+    """A frame shaped like ``Ticker.history()``: capitalized columns and a tz-aware index."""
+    prices = synthetic_prices(n_bars, seed=seed, start=date(1980, 1, 1))
+    index = pd.DatetimeIndex(prices.pop("date")).tz_localize("America/New_York")
+    return pd.DataFrame({name.capitalize(): values for name, values in prices.items()}, index=index)
+
+
+def legacy_store(stock_id: int, symbol: str, hist: pd.DataFrame) -> int:
+    """The fetcher's storage step as it was before: load stored dates, iterrows, ORM objects."""
+    from app.extensions import db
+    from app.models import PriceHistory
+
+    existing_dates = {p.date for p in PriceHistory.query.filter_by(symbol=symbol).all()}
+    new_prices = []
+    for timestamp, row in hist.iterrows():
+        date_obj = timestamp.to_pydatetime().date()
+        if date_obj in existing_dates:
+            continue
+        new_prices.append(PriceHistory(
+            stock_id=stock_id, symbol=symbol, date=date_obj, open=row["Open"], high=row["High"],
+            low=row["Low"], close=row["Close"],
+            volume=int(row["Volume"]) if not pd.isna(row["Volume"]) else None,
+        ))
+    db.session.bulk_save_objects(new_prices)
+    db.session.commit()
+    db.session.expunge_all()
+    return len(new_prices)
+
+
+def upsert_store(stock_id: int, symbol: str, hist: pd.DataFrame) -> int:
+    from app.extensions import db
+    from app.services.price_store import price_rows_from_history, upsert_price_rows
+
+    inserted, _ = upsert_price_rows(symbol, price_rows_from_history(hist, stock_id, symbol))
+    db.session.commit()
+    return inserted
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    from app.extensions import db
+    from app.models import Stock
+
+    app = make_bench_app()
+    print(f"{'bars':>8} {'path':<8} {'empty table':>12} {'all conflicts':>14}")
+    with app.app_context():
+        for i, n_bars in enumerate(sizes):
+            hist = yfinance_frame(n_bars, seed=i)
+            for label, store in (("legacy", legacy_store), ("upsert", upsert_store)):
+                stock = Stock(symbol=f"{label[:3].upper()}{i}", name=label)
+                db.session.add(stock)
+                db.session.commit()
+                stock_id, symbol = stock.id, stock.symbol
+                fresh = timed(store, stock_id, symbol, hist)
+                again = timed(store, stock_id, symbol, hist)
+                print(f"{n_bars:>8} {label:<8} {fresh * 1e3:>9.1f} ms {again * 1e3:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [2_500, 10_000, 50_000])
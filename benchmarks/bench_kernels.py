@@ -0,0 +1,56 @@
+"""Time the NumPy indicator kernels against the pandas implementations.
+
+Their parity, NaN warmup included, is tested in ``tests/test_kernels.py``.
+
+Usage:
+    python -m benchmarks.bench_kernels [length ...]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of
+from app.indicators.ema import compute_ema
+from app.indicators.macd import compute_macd
+from app.indicators.rsi import compute_rsi
+from app.indicators.sma import compute_sma
+
+DEFAULT_LENGTHS = [250, 2_500, 25_000, 250_000, 2_500_000, 10_000_000]
+
+INDICATORS = {
+    "rsi(14)": lambda close, backend: compute_rsi(close, 14, backend=backend),
+    "macd(12,26,9)": lambda close, backend: compute_macd(close, 12, 26, 9, backend=backend),
+    "sma(20)": lambda close, backend: compute_sma(close, 20, backend=backend),
+    "sma(200)": lambda close, backend: compute_sma(close, 200, backend=backend),
+    "ema(12)": lambda close, backend: compute_ema(close, 12, backend=backend),
+    "ema(26)": lambda close, backend: compute_ema(close, 26, backend=backend),
+}
+
+
+def synthetic_close(length: int, seed: int = 0) -> pd.Series:
+    # Cycles plus noise keep prices in a realistic range however long the series is
+    rng = np.random.default_rng(seed)
+    t = np.arange(length)
+    log_price = 0.3 * np.sin(2 * np.pi * t / 2520) + 0.05 * np.sin(2 * np.pi * t / 97) + rng.normal(0, 0.01, length)
+    close = 100 * np.exp(log_price)
+    if length > 100:
+        close[:5] = np.nan            # symbol listed after the panel starts
+        close[40:70] = close[40]      # trading halt: no gains or losses
+    return pd.Series(close)
+
+
+def main(lengths):
+    print(f"{'length':>10} {'indicator':>14} {'pandas (ms)':>12} {'numpy (ms)':>11} {'speedup':>8}")
+    for length in lengths:
+        close = synthetic_close(length)
+        repeat = int(min(max(1_000_000 // length, 2), 200))
+        for name, compute in INDICATORS.items():
+            pandas_time = best_of(lambda: compute(close, "pandas"), repeat)
+            numpy_time = best_of(lambda: compute(close, "numpy"), repeat)
+            print(f"{length:>10} {name:>14} {pandas_time * 1e3:>12.3f} {numpy_time * 1e3:>11.3f} "
+                  f"{pandas_time / numpy_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_LENGTHS)
@@ -0,0 +1,57 @@
+"""Compare time to first byte and peak memory of the buffered and NDJSON history responses.
+
+The history view is called directly inside a request context with the price
+cache disabled, so every response reads from the database.
+
+Usage:
+    python -m benchmarks.bench_streaming [n_bars]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.common import make_bench_app, seed_symbol
+
+FORMATS = {
+    "json": "",
+    "columnar": "format=columnar",
+    "ndjson": "format=ndjson",
+}
+
+
+def main(n_bars: int):
+    from app.extensions import price_cache
+    from app.views.stock import get_stock_history
+
+    app = make_bench_app()
+    app.config["LOGIN_DISABLED"] = True
+    with app.app_context():
+        seed_symbol("BIG", n_bars)
+    price_cache.enabled = False
+
+    def respond(query):
+        with app.test_request_context(f"/?{query}"):
+            start = time.perf_counter()
+            response, _ = get_stock_history("BIG")
+            chunks = iter(response.response)
+            size = len(next(chunks))
+            first_byte = time.perf_counter() - start
+            size += sum(len(chunk) for chunk in chunks)
+            return first_byte, time.perf_counter() - start, size
+
+    print(f"1 symbol x {n_bars} bars")
+    for label, query in FORMATS.items():
+        first_byte, total, size = respond(query)
+
+        # Measured in a second pass, tracing allocations slows everything down
+        tracemalloc.start()
+        respond(query)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"  {label:<9} first byte {first_byte * 1e3:8.1f} ms  total {total * 1e3:8.1f} ms"
+              f"  peak memory {peak / 1e6:7.1f} MB  body {size / 1e6:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,85 @@
+"""Shared helpers for the benchmark scripts in this package.
+
+Benchmarks run against a throwaway SQLite database by default; set
+``BENCH_DATABASE_URI`` to point them at a local Postgres instead.
+"""
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+DEFAULT_DATABASE_URI = "sqlite:///:memory:"
+
+# The config classes read the environment at import time, so this has to
+# happen before anything under ``app`` is imported.
+os.environ.setdefault("FLASK_CONFIG", "test")
+os.environ["TEST_DATABASE_URI"] = os.environ.get("BENCH_DATABASE_URI", DEFAULT_DATABASE_URI)
+
+
+def make_bench_app():
+    """Create a testing app bound to the benchmark database, with tables created."""
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app("test")
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def synthetic_prices(n_bars: int, seed: int = 0, start: date = date(1990, 1, 1)) -> dict:
+    """Generate a deterministic random-walk OHLCV series of ``n_bars`` daily bars."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    spread = np.abs(rng.normal(0, 0.005, n_bars)) * close
+    return {
+        "date": [start + timedelta(days=i) for i in range(n_bars)],
+        "open": close + rng.normal(0, 0.002, n_bars) * close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(10_000, 10_000_000, n_bars),
+    }
+
+
+def seed_symbol(symbol: str, n_bars: int, seed: int = 0) -> None:
+    """Insert a stock and ``n_bars`` of synthetic price history for it."""
+    from app.extensions import db
+    from app.models import Stock, PriceHistory
+
+    stock = Stock(symbol=symbol, name=symbol)
+    db.session.add(stock)
+    db.session.flush()
+
+    prices = synthetic_prices(n_bars, seed=seed)
+    rows = [{
+        "stock_id": stock.id,
+        "symbol": symbol,
+        "date": prices["date"][i],
+        "open": float(prices["open"][i]),
+        "high": float(prices["high"][i]),
+        "low": float(prices["low"][i]),
+        "close": float(prices["close"][i]),
+        "volume": int(prices["volume"][i]),
+    } for i in range(n_bars)]
+    db.session.execute(PriceHistory.__table__.insert(), rows)
+    db.session.commit()
+
+
+def seed_universe(n_symbols: int, n_bars: int, seed: int = 0) -> list:
+    """Insert ``n_symbols`` stocks named SYN0000, SYN0001, ... with ``n_bars`` of synthetic history each."""
+    symbols = [f"SYN{i:04d}" for i in range(n_symbols)]
+    for i, symbol in enumerate(symbols):
+        seed_symbol(symbol, n_bars, seed=seed + i)
+    return symbols
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    """Return the best wall-clock time in seconds of ``repeat`` calls to ``fn``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
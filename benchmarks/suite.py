@@ -0,0 +1,194 @@
+"""Benchmark suite over a deterministic synthetic universe, with JSON results to compare across commits.
+
+Seeds ``--symbols`` stocks with ``--years`` of daily bars each (252 bars a
+year) into the benchmark database (SQLite in memory unless
+``BENCH_DATABASE_URI`` points at a local Postgres), then times:
+
+    loader.*     the price loaders, from the database and from the price cache
+    compute.*    every compute_* function on both backends
+    service.*    calculate_indicators and calculate_batch_indicators
+    serialize.*  JSON encoding of the history and indicator payloads
+    http.*       /history and /indicators end to end through the Flask test client
+
+Each case runs once to warm up and then ``--repeat`` times; min, median and
+mean wall-clock seconds are reported. ``--output`` writes them as JSON
+together with the commit, library versions and database. ``--compare``
+reads an earlier output file, prints the change in medians and exits with
+status 1 if any case got slower by more than ``--threshold``.
+
+Usage:
+    python -m benchmarks.suite [--symbols 20] [--years 10] [--repeat 7]
+                               [--output results.json] [--compare baseline.json] [--threshold 0.1]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import make_bench_app, seed_universe
+
+BARS_PER_YEAR = 252
+INDICATORS = {"rsi": True, "macd": True, "sma": [20, 50, 200], "ema": [12, 26]}
+INDICATOR_QUERY = "rsi=true&macd=true&sma=20&sma=50&sma=200&ema=12&ema=26"
+BACKENDS = ("pandas", "numpy")
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "mean": statistics.fmean(timings),
+            "repeat": repeat}
+
+
+def cases(app, symbols: list) -> dict:
+    """Benchmark callables by name, to be run inside an app context."""
+    from flask import json as flask_json
+
+    from app.extensions import price_cache
+    from app.indicators.ema import compute_ema
+    from app.indicators.macd import compute_macd
+    from app.indicators.rsi import compute_rsi
+    from app.indicators.sma import compute_sma
+    from app.services.indicator_service import calculate_batch_indicators, calculate_indicators
+    from app.utils import columnar
+    from app.utils.data_loader import get_price_history_df, load_price_history_df
+
+    symbol = symbols[0]
+    close = load_price_history_df(symbol)["close"]
+    history = get_price_history_df(symbol)
+    indicators = calculate_indicators(symbol, INDICATORS)
+    indicators_columnar = calculate_indicators(symbol, INDICATORS, date_format="epoch")
+    client = app.test_client()
+
+    def uncached_indicators():
+        price_cache.invalidate(symbol)
+        calculate_indicators(symbol, INDICATORS)
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        response.get_data()
+
+    suite = {
+        "loader.load_price_history_df": lambda: load_price_history_df(symbol),
+        "loader.get_price_history_df[cached]": lambda: get_price_history_df(symbol),
+    }
+    for backend in BACKENDS:
+        suite.update({
+            f"compute.rsi[{backend}]": lambda b=backend: compute_rsi(close, 14, backend=b),
+            f"compute.macd[{backend}]": lambda b=backend: compute_macd(close, 12, 26, 9, backend=b),
+            f"compute.sma[{backend}]": lambda b=backend: compute_sma(close, 200, backend=b),
+            f"compute.ema[{backend}]": lambda b=backend: compute_ema(close, 26, backend=b),
+        })
+    suite.update({
+        "service.calculate_indicators": lambda: calculate_indicators(symbol, INDICATORS),
+        "service.calculate_indicators[uncached prices]": uncached_indicators,
+        "service.calculate_batch_indicators": lambda: calculate_batch_indicators(symbols, INDICATORS),
+        "serialize.history_json": lambda: flask_json.dumps(history.to_dict(orient="records")),
+        "serialize.indicators_json": lambda: flask_json.dumps(indicators),
+        "serialize.indicators_columnar": lambda: columnar.dumps(indicators_columnar),
+        "http.history": lambda: get(f"/api/v1/stock/{symbol}/history"),
+        "http.history[columnar]": lambda: get(f"/api/v1/stock/{symbol}/history?format=columnar"),
+        "http.indicators": lambda: get(f"/api/v1/stock/{symbol}/indicators?{INDICATOR_QUERY}"),
+        "http.indicators[columnar]": lambda: get(f"/api/v1/stock/{symbol}/indicators?{INDICATOR_QUERY}"
+                                                 "&format=columnar"),
+    })
+    return suite
+
+
+def environment(app, n_symbols: int, years: int) -> dict:
+    from app.extensions import db
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with app.app_context():
+        database = db.engine.dialect.name
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "database": database,
+        "symbols": n_symbols,
+        "years": years,
+        "bars_per_symbol": years * BARS_PER_YEAR,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Print median changes against ``baseline`` and return the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<48} {'-':>10} {result['median'] * 1e3:>8.2f}ms {'new':>8}")
+            continue
+        change = result["median"] / before["median"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<48} {before['median'] * 1e3:>8.2f}ms {result['median'] * 1e3:>8.2f}ms {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Results file of an earlier run to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Median slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    from app.extensions import limiter
+
+    app = make_bench_app()
+    app.config["LOGIN_DISABLED"] = True
+    limiter.enabled = False  # the default limit would reject repeated requests
+    with app.app_context():
+        started = time.perf_counter()
+        symbols = seed_universe(args.symbols, args.years * BARS_PER_YEAR)
+        print(f"Seeded {args.symbols} symbols x {args.years} years in {time.perf_counter() - started:.1f}s")
+
+        results = {}
+        for name, fn in cases(app, symbols).items():
+            results[name] = measure(fn, args.repeat)
+            print(f"{name:<48} {results[name]['median'] * 1e3:>10.3f} ms  (min {results[name]['min'] * 1e3:.3f})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(app, args.symbols, args.years), "results": results}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["environment"]["bars_per_symbol"] != args.years * BARS_PER_YEAR:
+            print("Warning: the baseline was run with a different universe")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
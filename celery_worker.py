@@ -10,6 +10,9 @@ if os.path.exists(dotenv_path):
 else:
     print("WARNING: .env file not found at", dotenv_path)
 
+# Database pool settings for worker processes, see Config.DATABASE_POOL_OPTIONS
+os.environ.setdefault("APP_ROLE", "celery")
+
 from app import create_app, celery_app as _celery_app
 
 
@@ -1,3 +1,24 @@
+import os
+import shutil
+import tempfile
+
 bind = "0.0.0.0:8000"
 workers = 4
 
+# Prometheus multi-process mode: each worker writes its request histograms to files
+# in this directory and /metrics aggregates them. Set before any worker imports the app.
+prometheus_multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "flask-stock-analyzer-metrics")
+)
+
+
+def on_starting(server):
+    # Drop files of a previous run, which would otherwise be added to this one's
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
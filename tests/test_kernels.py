@@ -0,0 +1,76 @@
+"""The NumPy indicator kernels must reproduce the pandas implementations, NaN warmup included."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.indicators.ema import compute_ema
+from app.indicators.macd import compute_macd
+from app.indicators.rsi import compute_rsi
+from app.indicators.sma import compute_sma
+
+WINDOWS = [1, 2, 14, 200]
+LENGTHS = list(range(1, 41)) + [199, 200, 201, 250, 2_500]
+
+INDICATORS = {
+    "rsi": lambda close, window, backend: compute_rsi(close, window, backend=backend),
+    "sma": lambda close, window, backend: compute_sma(close, window, backend=backend),
+    "ema": lambda close, window, backend: compute_ema(close, window, backend=backend),
+    "macd": lambda close, window, backend: compute_macd(close, backend=backend),
+}
+
+
+def synthetic_close(length: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, length)))
+    if length > 100:
+        close[40:70] = close[40]      # trading halt: no gains or losses
+    return pd.Series(close)
+
+
+def assert_parity(expected, actual) -> None:
+    expected = np.column_stack(expected) if isinstance(expected, tuple) else expected.to_numpy()
+    actual = np.column_stack(actual) if isinstance(actual, tuple) else actual.to_numpy()
+    assert actual.shape == expected.shape
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected), err_msg="NaN positions differ")
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("name", INDICATORS)
+@pytest.mark.parametrize("window", WINDOWS)
+@pytest.mark.parametrize("length", LENGTHS)
+def test_series_parity(name, window, length):
+    compute = INDICATORS[name]
+    close = synthetic_close(length)
+    assert_parity(compute(close, window, "pandas"), compute(close, window, "numpy"))
+
+
+@pytest.mark.parametrize("name", INDICATORS)
+@pytest.mark.parametrize("window", WINDOWS)
+def test_panel_with_leading_nans(name, window):
+    # Symbols listed after the panel starts have a leading block of missing values
+    panel = pd.DataFrame({symbol: synthetic_close(600, seed) for seed, symbol in enumerate("ABCD")})
+    panel.iloc[:5, 1] = np.nan
+    panel.iloc[:250, 2] = np.nan
+    panel.iloc[:, 3] = np.nan
+    compute = INDICATORS[name]
+    assert_parity(compute(panel, window, "pandas"), compute(panel, window, "numpy"))
+
+
+@pytest.mark.parametrize("window", WINDOWS)
+def test_warmup_positions(window):
+    close = synthetic_close(300)
+    close[:3] = np.nan
+    warmup = {
+        "sma": 3 + window - 1,
+        "rsi": 3 + window,
+        "ema": 3,
+    }
+    for name, leading in warmup.items():
+        values = INDICATORS[name](close, window, "numpy").to_numpy()
+        assert np.isnan(values[:leading]).all(), name
+        assert not np.isnan(values[leading]), name
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        compute_sma(synthetic_close(10), 2, backend="fortran")